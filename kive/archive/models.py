@@ -307,7 +307,14 @@ class Run(stopwatch.models.Stopwatch, metadata.models.AccessControl):
 
         # Can't have RunOutputCables from non-existent RunSteps.
         # TODO: Should this go in RunOutputCable.clean() ?
-        for run_outcable in self.runoutputcables.all():
+        run_outcables = self.runoutputcables.select_related(
+            "execrecord",
+            "pipelineoutputcable",
+            "run__parent_runstep__pipelinestep"
+        ).prefetch_related(
+            "outputs",
+            "run__parent_runstep__pipelinestep__outputs_to_delete")
+        for run_outcable in run_outcables:
             source_step = run_outcable.pipelineoutputcable.source_step
             try:
                 self.runsteps.get(pipelinestep__step_num=source_step)
@@ -1354,16 +1361,17 @@ class RunComponent(stopwatch.models.Stopwatch):
         This RunComponent has reused = None (the decision to reuse an
         ExecRecord or not has not yet been made).
         """
-        general_error = '{} "{}" has not decided whether or not to reuse an ExecRecord'.format(
-            self.__class__.__name__, self)
+        # The messages are only formatted if an error is actually displayed.
+        general_error = '%(component_type)s "%(component)s" has not decided whether or not to reuse an ExecRecord'
+        params = dict(component_type=self.__class__.__name__, component=self)
         if self.has_log():
-            raise ValidationError("{}; no log should have been generated".format(general_error))
+            raise ValidationError(general_error + "; no log should have been generated", params=params)
         if self.invoked_logs.exists():
-            raise ValidationError("{}; no steps or cables should have been invoked".format(general_error))
+            raise ValidationError(general_error + "; no steps or cables should have been invoked", params=params)
         if self.has_data():
-            raise ValidationError("{}; no Datasets should be associated".format(general_error))
-        if self.execrecord:
-            raise ValidationError("{}; execrecord should not be set yet".format(general_error))
+            raise ValidationError(general_error + "; no Datasets should be associated", params=params)
+        if self.execrecord_id is not None:
+            raise ValidationError(general_error + "; execrecord should not be set yet", params=params)
 
     def _clean_reused(self):
         """
@@ -1378,12 +1386,12 @@ class RunComponent(stopwatch.models.Stopwatch):
         PRE
         This RunComponent has reused = True (has decided to reuse an ExecRecord).
         """
+        general_error = '%(component_type)s "%(component)s" reused an ExecRecord'
+        params = dict(component_type=self.__class__.__name__, component=self)
         if self.has_data():
-            raise ValidationError('{} "{}" reused an ExecRecord and should not have generated any Datasets'
-                                  .format(self.__class__.__name__, self))
+            raise ValidationError(general_error + " and should not have generated any Datasets", params=params)
         if self.invoked_logs.exists():
-            raise ValidationError('{} "{}" reused an ExecRecord; no steps or cables should have been invoked'
-                                  .format(self.__class__.__name__, self))
+            raise ValidationError(general_error + "; no steps or cables should have been invoked", params=params)
 
     # Note: what clean() does in the not-reused case is specific to
     # the class, so the _clean_not_reused() method is extended
@@ -1404,20 +1412,21 @@ class RunComponent(stopwatch.models.Stopwatch):
         This RunComponent has reused = False (has decided not to reuse an ExecRecord).
         """
         if not self.has_log() or not self.log.is_complete():
-            general_error = '{} "{}" is not reused and does not have a complete log'.format(
-                self.__class__.__name__, self)
+            general_error = '%(component_type)s "%(component)s" is not reused and does not have a complete log'
+            params = dict(component_type=self.__class__.__name__, component=self)
             if self.has_data():
-                raise ValidationError("{} so should not have generated any Datasets".format(general_error))
-            if self.execrecord:
-                raise ValidationError("{}; execrecord should not be set".format(general_error))
+                raise ValidationError(general_error + " so should not have generated any Datasets", params=params)
+            if self.execrecord_id is not None:
+                raise ValidationError(general_error + "; execrecord should not be set", params=params)
             return False
 
         # On the flipside....
         if (self.execrecord is not None and
                 (not self.invoked_logs.exists() or self.has_log() and not self.log.is_complete())):
             raise ValidationError(
-                '{} "{}" is not reused and has not completed its own ExecLog but does have an ExecRecord'.format(
-                    self.__class__.__name__, self))
+                '%(component_type)s "%(component)s" is not reused and has not completed its own ExecLog '
+                'but does have an ExecRecord',
+                params=dict(component_type=self.__class__.__name__, component=self))
 
         return True
 
@@ -1830,13 +1839,15 @@ class RunStep(RunComponent):
         exec_log = getattr(self, 'log', None)
         outputs_missing = [] if exec_log is None else exec_log.missing_outputs()
 
+        deleted_names = {otd.dataset_name for otd in self.pipelinestep.outputs_to_delete.all()}
+
         # Go through all of the outputs.
         for to in self.pipelinestep.transformation.outputs.all():
             # Get the associated ERO.
             corresp_ero = self.execrecord.execrecordouts.get(generic_output=to)
             corresp_ds = corresp_ero.dataset
 
-            if self.pipelinestep.outputs_to_delete.filter(dataset_name=to.dataset_name).exists():
+            if to.dataset_name in deleted_names:
                 # This output is deleted; there should be no associated Dataset.
                 if self.outputs.filter(pk=corresp_ds.pk).exists() and corresp_ds.has_data():
                     raise ValidationError('Output "{}" of RunStep "{}" is deleted; no data should be associated'
@@ -2141,6 +2152,15 @@ class RunCable(RunComponent):
         """
         pass
 
+    def _cable_error_params(self):
+        """
+        Parameters for validation error messages about this cable.
+
+        Django only formats the message if the error is displayed, so
+        this RunCable's str() is only computed when needed.
+        """
+        return dict(cable_type=self._cable_type_str(), cable=self)
+
     @property
     def component(self):
         return self.PSIC
@@ -2176,21 +2196,24 @@ class RunCable(RunComponent):
 
         # From here on, the ExecLog is known to be complete.
 
+        # Two outputs are enough to tell if there are too many, and this
+        # loads them in one query (or none, if they were prefetched).
+        outputs = self.outputs.all()[:2]
+
         # If this cable is trivial, there should be no data
         # associated.
-        if self.has_data() and self.outputs.first().has_data():
+        if outputs and outputs[0].has_data():
             if self._pipeline_cable().is_trivial():
                 raise ValidationError(
-                    '{} "{}" is trivial and should not have generated any Datasets'.format(
-                        self._cable_type_str(), self)
-                )
+                    '%(cable_type)s "%(cable)s" is trivial and should not have generated any Datasets',
+                    params=self._cable_error_params())
 
             # Otherwise, check that there is at most one Dataset
             # attached, and clean it.
-            if self.outputs.count() > 1:
-                raise ValidationError('{} "{}" should generate at most one Dataset'.format(
-                    self._cable_type_str(), self))
-            self.outputs.first().clean()
+            if len(outputs) > 1:
+                raise ValidationError('%(cable_type)s "%(cable)s" should generate at most one Dataset',
+                                      params=self._cable_error_params())
+            outputs[0].clean()
         return True
 
     def _clean_cable_coherent(self):
@@ -2216,20 +2239,22 @@ class RunCable(RunComponent):
         PRE
         This RunCable has an ExecLog.
         """
+        # Slice instead of calling first(), so prefetched outputs get used.
+        outputs = self.outputs.all()[:1]
+
         # If output of the cable not marked as kept, there shouldn't be a Dataset.
         if not self.keeps_output():
             # Check if the attached output has real data associated to it.
-            if self.has_data() and self.outputs.first().has_data():
+            if outputs and outputs[0].has_data():
                 raise ValidationError(
-                    '{} "{}" does not keep its output but a dataset was registered'.format(
-                        self._cable_type_str(), self)
-                )
+                    '%(cable_type)s "%(cable)s" does not keep its output but a dataset was registered',
+                    params=self._cable_error_params())
 
         # If EL shows missing output, there shouldn't be a Dataset.
         elif self.log.missing_outputs():
-            if self.has_data() and self.outputs.first().has_data():
-                raise ValidationError('{} "{}" had missing output but a dataset was registered'.format(
-                    self._cable_type_str(), self))
+            if outputs and outputs[0].has_data():
+                raise ValidationError('%(cable_type)s "%(cable)s" had missing output but a dataset was registered',
+                                      params=self._cable_error_params())
 
     def _clean_without_execlog_reused_check_output(self):
         """
@@ -2245,9 +2270,8 @@ class RunCable(RunComponent):
         # Case 1: Completely recycled ER (reused = true): it should
         # not have any registered dataset)
         if self.outputs.exists():
-            raise ValidationError('{} "{}" was reused but has a registered dataset'.format(
-                self._cable_type_str(), self
-            ))
+            raise ValidationError('%(cable_type)s "%(cable)s" was reused but has a registered dataset',
+                                  params=self._cable_error_params())
 
     def _clean_without_execlog_not_reused(self):
         """
@@ -2261,11 +2285,13 @@ class RunCable(RunComponent):
         PRE: this RunCable is not reused, has no ExecLog, and passes
         clean up to the point that this function is invoked.
         """
-        general_error = '{} "{}" not reused and has no ExecLog'.format(self._cable_type_str(), self)
+        general_error = '%(cable_type)s "%(cable)s" not reused and has no ExecLog'
         if self.outputs.exists():
-            raise ValidationError("{}, but has a Dataset output".format(general_error))
-        if self.execrecord is not None:
-            raise ValidationError("{}, but has an ExecRecord".format(general_error))
+            raise ValidationError(general_error + ", but has a Dataset output",
+                                  params=self._cable_error_params())
+        if self.execrecord_id is not None:
+            raise ValidationError(general_error + ", but has an ExecRecord",
+                                  params=self._cable_error_params())
 
     def _clean_execrecord(self):
         """
@@ -2297,8 +2323,9 @@ class RunCable(RunComponent):
         if self.keeps_output():
             if self.reused or len(self.log.missing_outputs()) == 0:
 
-                # TODO: helper to get the ExecRecordOut without calling first().
-                corresp_ero = self.execrecord.execrecordouts.first()
+                # A cable's ExecRecord has exactly one ExecRecordOut, but it may
+                # belong to a different cable, so don't filter on our own output.
+                corresp_ero = self.execrecord.execrecordouts.select_related("dataset").get()
                 if not corresp_ero.has_data():
                     raise ValidationError('{} "{}" keeps its output; ExecRecordOut "{}" should reference existent '
                                           'data'.format(self._cable_type_str(), self, corresp_ero))
@@ -2307,13 +2334,16 @@ class RunCable(RunComponent):
                 # there should be associated data, and it should match that
                 # of corresp_ero.
                 if not self.reused and not self._pipeline_cable().is_trivial():
-                    if not (self.has_data() and self.outputs.first().has_data()):
+                    # Slice instead of calling first(), so prefetched outputs get used.
+                    outputs = self.outputs.all()[:1]
+                    output = outputs[0] if outputs else None
+                    if not (output is not None and output.has_data()):
                         raise ValidationError('{} "{}" was not reused, trivial, or deleted; it should have '
                                               'produced data'.format(self._cable_type_str(), self))
 
-                    if corresp_ero.dataset != self.outputs.first():
+                    if corresp_ero.dataset != output:
                         raise ValidationError('Dataset "{}" was produced by {} "{}" but is not in an ERO of '
-                                              'ExecRecord "{}"'.format(self.outputs.first(),
+                                              'ExecRecord "{}"'.format(output,
                                                                        self._cable_type_str(),
                                                                        self,
                                                                        self.execrecord))
@@ -2361,7 +2391,9 @@ class RunCable(RunComponent):
         self._clean_execlogs()
 
         if self.reused is None:
+            # This has already confirmed there is no log, data, or ExecRecord.
             self._clean_undecided_reused()
+            return
         elif self.reused:
             self._clean_reused()
         elif not self._clean_not_reused():
@@ -2385,7 +2417,7 @@ class RunCable(RunComponent):
 
         # If there is no execrecord defined but there is a log, then
         # check for spurious CCLs and ICLs and stop.
-        if self.execrecord is None:
+        if self.execrecord_id is None:
             if self.has_log():
                 self._clean_has_execlog_no_execrecord_yet()
             return
@@ -2669,17 +2701,19 @@ class RunOutputCable(RunCable):
             return True
 
         # At this point we know that this is a sub-Pipeline.  Check
-        # if the parent PipelineStep deletes this output.
-        return not self.run.parent_runstep.pipelinestep.outputs_to_delete.filter(
-                dataset_idx=self.pipelineoutputcable.output_idx).exists()
+        # if the parent PipelineStep deletes this output.  Scan all() instead
+        # of filtering, so a prefetched list gets used.
+        output_idx = self.pipelineoutputcable.output_idx
+        return not any(otd.dataset_idx == output_idx
+                       for otd in self.run.parent_runstep.pipelinestep.outputs_to_delete.all())
 
     def _clean_cable_coherent(self):
         """
         Checks that the POC and Pipeline are coherent.
         """
         if not self.run.pipeline.outcables.filter(pk=self.pipelineoutputcable.pk).exists():
-            raise ValidationError('POC "{}" does not belong to Pipeline "{}"'
-                                  .format(self.pipelineoutputcable, self.run.pipeline))
+            raise ValidationError('POC "%(poc)s" does not belong to Pipeline "%(pipeline)s"',
+                                  params=dict(poc=self.pipelineoutputcable, pipeline=self.run.pipeline))
 
     def get_coordinates(self):
         """
@@ -2131,7 +2131,7 @@ class RunOutputCableTests(ArchiveTestCase):
         marked the relevant output for deletion, should not have
         any associated Datasets."""
         self.step_through_roc_creation("subrun")
-        self.step_E2.outputs_to_delete.add(self.pD.outputs.get(dataset_name="D1_out"))
+        self.step_E2.outputs_to_delete.add(self.D1_out)
         self.assertIsNone(self.D11_21_ROC.clean())
 
     def test_ROC_clean_deleted_output_with_data(self):
@@ -2142,7 +2142,7 @@ class RunOutputCableTests(ArchiveTestCase):
         any associated Datasets."""
 
         self.step_through_roc_creation("subrun_complete")
-        self.step_E2.outputs_to_delete.add(self.pD.outputs.get(dataset_name="D1_out"))
+        self.step_E2.outputs_to_delete.add(self.D1_out)
 
         self.assertFalse(self.D11_21_ROC.keeps_output())
         self.assertTrue(self.D11_21_ROC.outputs.exists())
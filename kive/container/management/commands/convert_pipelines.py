@@ -332,7 +332,7 @@ class Command(BaseCommand):
                            source_dataset_name=cable.source.definite.dataset_name,
                            source_step=cable.source_step)
                       for cable in step.cables_in.order_by('dest__dataset_idx')]
-            output_names = [o.dataset_name for o in method.outputs.all()]
+            output_names = list(method.outputs.values_list('dataset_name', flat=True))
             dependencies = []
             for dependency in method.dependencies.all():
                 dependencies.append(os.path.join(dependency.path,
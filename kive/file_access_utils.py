@@ -15,6 +15,7 @@ import stat
 import time
 import io
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 
 from django.conf import settings
 from django.http import FileResponse
@@ -165,7 +166,12 @@ def build_download_response(field_file):
     return response
 
 
-def compute_md5(file_to_checksum, chunk_size=1024*64):
+# Chunks this big are hashed without holding the GIL, so other threads can
+# hash or read files at the same time.
+MD5_CHUNK_SIZE = 1024*1024
+
+
+def compute_md5(file_to_checksum, chunk_size=MD5_CHUNK_SIZE):
     """Computes MD5 checksum of specified file.
 
     file_to_checksum should be an open, readable, file handle, with
@@ -175,11 +181,145 @@ def compute_md5(file_to_checksum, chunk_size=1024*64):
     so that bytes (not strings) are returned when iterating over the file.
     """
     md5gen = hashlib.md5()
+    readinto = getattr(file_to_checksum, "readinto", None)
+    if readinto is None:
+        # Text files can't read into a buffer.
+        while True:
+            chunk = file_to_checksum.read(chunk_size)
+            if not chunk:
+                return md5gen.hexdigest()
+            md5gen.update(chunk)
+
+    # Reuse one buffer, instead of allocating a new chunk for every read.
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
     while True:
-        chunk = file_to_checksum.read(chunk_size)
-        if not chunk:
+        bytes_read = readinto(buf)
+        if not bytes_read:
             return md5gen.hexdigest()
-        md5gen.update(chunk)
+        md5gen.update(view[:bytes_read])
+
+
+# Files at least this big are dropped from the page cache after they are
+# checksummed, so verifying many of them doesn't push everything else out.
+DROP_CACHE_MIN_SIZE = 1024*1024*1024
+
+
+def read_blocks(file_path, chunk_size=MD5_CHUNK_SIZE):
+    """Yields the contents of the file at the specified path, one chunk at a time.
+
+    This skips Django's file wrappers and tells the kernel that the file will
+    be read sequentially.  Every chunk is read into the same buffer, so each
+    memoryview that is yielded is only valid until the next one.  The file
+    isn't memory mapped, because a file that another process truncates while
+    it's mapped would kill this process with SIGBUS.
+    """
+    can_advise = hasattr(os, "posix_fadvise")
+    with io.open(file_path, "rb", buffering=0) as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if can_advise:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        while True:
+            bytes_read = f.readinto(buf)
+            if not bytes_read:
+                break
+            yield view[:bytes_read]
+        if can_advise and file_size >= DROP_CACHE_MIN_SIZE:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def compute_md5_from_path(file_path, chunk_size=MD5_CHUNK_SIZE):
+    """Computes MD5 checksum of the file at the specified path."""
+    md5gen = hashlib.md5()
+    for block in read_blocks(file_path, chunk_size):
+        md5gen.update(block)
+    return md5gen.hexdigest()
+
+
+# Large files also get a checksum for each chunk, so they can be verified in
+# parallel.  Smaller files are only checked with a single MD5.
+CHUNK_CHECKSUM_SIZE = 16*1024*1024
+CHUNK_CHECKSUM_MIN_SIZE = 4*CHUNK_CHECKSUM_SIZE
+
+# Chunk checksums are only compared with each other, not shown to users, so
+# they use a faster hash than MD5 when one is available.
+CHUNK_HASH_ALGORITHM = "blake2b" if "blake2b" in hashlib.algorithms_available else "md5"
+
+
+def compute_chunk_checksums(file_path,
+                            algorithm=CHUNK_HASH_ALGORITHM,
+                            chunk_size=CHUNK_CHECKSUM_SIZE,
+                            max_workers=None):
+    """Computes the checksum of each chunk of the specified file.
+
+    The chunks are hashed on a pool of threads: hashlib releases the GIL
+    while it hashes large buffers, so this scales with the number of cores.
+    max_workers defaults to the number of CPUs.  Set it to 1 to hash the
+    chunks in this thread, like when this is already running in a pool.
+
+    Returns a list of hex digests, one for each chunk, in file order.
+    """
+    def compute_chunk_checksum(offset):
+        with open(file_path, "rb") as f:
+            f.seek(offset)
+            return hashlib.new(algorithm, f.read(chunk_size)).hexdigest()
+
+    file_size = os.stat(file_path).st_size
+    offsets = range(0, file_size, chunk_size)
+    if max_workers == 1:
+        # Don't start a pool inside another pool's worker.
+        return [compute_chunk_checksum(offset) for offset in offsets]
+    pool = ThreadPool(max_workers)
+    try:
+        return pool.map(compute_chunk_checksum, offsets)
+    finally:
+        pool.close()
+        pool.join()
+
+
+class ChunkedChecksum(object):
+    """Computes the MD5 of some data and the checksum of each chunk of it.
+
+    Pass the data to update() in order, so a new file only has to be read
+    once to get both kinds of checksum.  The chunk checksums match the ones
+    from compute_chunk_checksums().
+    """
+    def __init__(self, algorithm=CHUNK_HASH_ALGORITHM, chunk_size=CHUNK_CHECKSUM_SIZE):
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.size = 0
+        self.md5gen = hashlib.md5()
+        self.chunk_checksums = []
+        self.chunk_gen = hashlib.new(algorithm)
+        self.chunk_remaining = chunk_size
+
+    def update(self, data):
+        data = memoryview(data)
+        self.md5gen.update(data)
+        self.size += len(data)
+        while len(data):
+            part = data[:self.chunk_remaining]
+            self.chunk_gen.update(part)
+            self.chunk_remaining -= len(part)
+            data = data[len(part):]
+            if not self.chunk_remaining:
+                self.chunk_checksums.append(self.chunk_gen.hexdigest())
+                self.chunk_gen = hashlib.new(self.algorithm)
+                self.chunk_remaining = self.chunk_size
+
+    def hexdigest(self):
+        """The MD5 of all the data so far."""
+        return self.md5gen.hexdigest()
+
+    def chunk_hexdigests(self):
+        """The checksum of each chunk so far, including the last partial one."""
+        checksums = list(self.chunk_checksums)
+        if self.chunk_remaining < self.chunk_size:
+            checksums.append(self.chunk_gen.hexdigest())
+        return checksums
+
 
 
 def file_exists(path):
@@ -319,8 +459,7 @@ def confirm_file_created(path,
         if os.path.exists(path):
             pre_md5_time = timezone.now()
             # While we're waiting, we compute the MD5.
-            with open(path, "rb") as f:
-                curr_md5 = compute_md5(f)
+            curr_md5 = compute_md5_from_path(path)
             post_md5_time = timezone.now()
 
             seconds_elapsed = (post_md5_time - pre_md5_time).total_seconds()
@@ -0,0 +1,27 @@
+""" Test runner that gives each parallel test process its own media folder. """
+import os
+
+from django.conf import settings
+from django.test import override_settings
+from django.test import runner
+
+
+def init_worker(counter):
+    """ Switch to a database and a media folder dedicated to this worker.
+
+    The tests remove all the files under MEDIA_ROOT when they clean up, so
+    workers that shared it would delete each other's files.
+    """
+    runner._init_worker(counter)
+    media_root = os.path.join(settings.MEDIA_ROOT,
+                              'Worker{}'.format(runner._worker_id),
+                              'Testing')
+    override_settings(MEDIA_ROOT=media_root).enable()
+
+
+class KiveParallelTestSuite(runner.ParallelTestSuite):
+    init_worker = init_worker
+
+
+class KiveTestRunner(runner.DiscoverRunner):
+    parallel_test_suite = KiveParallelTestSuite
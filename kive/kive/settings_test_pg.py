@@ -9,6 +9,9 @@ from kive.settings import *  # @UnusedWildImport
 # Avoid overwriting developer data files
 MEDIA_ROOT = os.path.join(MEDIA_ROOT, 'Testing')
 
+# Give each process its own MEDIA_ROOT when running tests with --parallel.
+TEST_RUNNER = 'kive.runner.KiveTestRunner'
+
 
 # Disable logging to console so test output isn't polluted.
 LOGGING['handlers']['console']['level'] = 'CRITICAL'
@@ -13,15 +13,18 @@ import time
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.files import File
+from django.core.files.base import ContentFile
 from django.db import transaction
 from django.db.models import Count
 
 from constants import datatypes
 import file_access_utils
 from librarian.models import Dataset, ExecRecord
-from metadata.models import BasicConstraint, CompoundDatatype, Datatype, everyone_group
+from metadata.models import BasicConstraint, CompoundDatatype, CompoundDatatypeMember, \
+    Datatype, everyone_group
 from method.models import CodeResource, CodeResourceRevision, Method, MethodFamily
 from pipeline.models import Pipeline, PipelineFamily, PipelineStep
+from transformation.models import XputStructure
 from archive.models import RunStep, ExecLog, MethodOutput
 from datachecking.models import VerificationLog
 from fleet.workers import Manager
@@ -30,6 +33,23 @@ from fleet.slurmlib import DummySlurmScheduler
 
 samplecode_path = "../samplecode"
 
+# Contents of the sample files, read once for the whole test run.
+_sample_contents = {}
+
+
+def sample_file(file_name):
+    """
+    Return a ContentFile holding the named file from samplecode.
+
+    The file is read from disk the first time it is requested.
+    """
+    contents = _sample_contents.get(file_name)
+    if contents is None:
+        with open(os.path.join(samplecode_path, file_name), "rb") as f:
+            contents = f.read()
+        _sample_contents[file_name] = contents
+    return ContentFile(contents, name=file_name)
+
 
 # This is copied from
 # http://stackoverflow.com/questions/2023608/check-what-files-are-open-in-python
@@ -110,34 +130,40 @@ def create_metadata_test_environment(case):
         rule="^[ACGUacgu]*$")
     case.RNA_dt.save()
 
+    # The CDT members are collected here and saved together at the end.
+    members = []
+
     # Define a new CDT with a bunch of different member
     case.basic_cdt = CompoundDatatype(user=case.myUser)
     case.basic_cdt.save()
     case.basic_cdt.grant_everyone_access()
     case.basic_cdt.save()
 
-    case.basic_cdt.members.create(
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.basic_cdt,
         datatype=case.string_dt,
         column_name='label',
-        column_idx=1)
-    case.basic_cdt.members.create(
+        column_idx=1))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.basic_cdt,
         datatype=case.INT,
         column_name='integer',
-        column_idx=2)
-    case.basic_cdt.members.create(
+        column_idx=2))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.basic_cdt,
         datatype=case.FLOAT,
         column_name='float',
-        column_idx=3)
-    case.basic_cdt.members.create(
+        column_idx=3))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.basic_cdt,
         datatype=case.BOOL,
         column_name='bool',
-        column_idx=4)
-    case.basic_cdt.members.create(
+        column_idx=4))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.basic_cdt,
         datatype=case.RNA_dt,
         column_name="rna",
-        column_idx=5)
-    case.basic_cdt.full_clean()
-    case.basic_cdt.save()
+        column_idx=5))
 
     # Define a new CDT that is only accessible to two users
     shared_cdt = CompoundDatatype(user=case.myUser)
@@ -145,10 +171,11 @@ def create_metadata_test_environment(case):
     shared_cdt.users_allowed.add(case.ringoUser)
     shared_cdt.save()
 
-    shared_cdt.members.create(
+    members.append(CompoundDatatypeMember(
+        compounddatatype=shared_cdt,
         datatype=case.string_dt,
         column_name='label',
-        column_idx=1)
+        column_idx=1))
 
     # Define test_cdt as containing 3 members:
     # (label, PBMCseq, PLAseq) as (string,DNA,RNA)
@@ -156,64 +183,61 @@ def create_metadata_test_environment(case):
     case.test_cdt.save()
     case.test_cdt.grant_everyone_access()
     case.test_cdt.save()
-    case.test_cdt.members.create(
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.test_cdt,
         datatype=case.string_dt,
         column_name="label",
-        column_idx=1)
-    case.test_cdt.members.create(
+        column_idx=1))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.test_cdt,
         datatype=case.DNA_dt,
         column_name="PBMCseq",
-        column_idx=2)
-    case.test_cdt.members.create(
+        column_idx=2))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.test_cdt,
         datatype=case.RNA_dt,
         column_name="PLAseq",
-        column_idx=3)
-    case.test_cdt.full_clean()
-    case.test_cdt.save()
+        column_idx=3))
 
     # Define DNAinput_cdt (1 member)
     case.DNAinput_cdt = CompoundDatatype(user=case.myUser)
     case.DNAinput_cdt.save()
-    case.DNAinput_cdt.members.create(
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.DNAinput_cdt,
         datatype=case.DNA_dt,
         column_name="SeqToComplement",
-        column_idx=1)
+        column_idx=1))
     case.DNAinput_cdt.grant_everyone_access()
-    case.DNAinput_cdt.full_clean()
-    case.DNAinput_cdt.save()
 
     # Define DNAoutput_cdt (1 member)
     case.DNAoutput_cdt = CompoundDatatype(user=case.myUser)
     case.DNAoutput_cdt.save()
-    case.DNAoutput_cdt.members.create(
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.DNAoutput_cdt,
         datatype=case.DNA_dt,
         column_name="ComplementedSeq",
-        column_idx=1)
+        column_idx=1))
     case.DNAoutput_cdt.grant_everyone_access()
-    case.DNAoutput_cdt.full_clean()
-    case.DNAoutput_cdt.save()
 
     # Define RNAinput_cdt (1 column)
     case.RNAinput_cdt = CompoundDatatype(user=case.myUser)
     case.RNAinput_cdt.save()
-    case.RNAinput_cdt.members.create(
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.RNAinput_cdt,
         datatype=case.RNA_dt,
         column_name="SeqToComplement",
-        column_idx=1)
+        column_idx=1))
     case.RNAinput_cdt.grant_everyone_access()
-    case.RNAinput_cdt.full_clean()
-    case.RNAinput_cdt.save()
 
     # Define RNAoutput_cdt (1 column)
     case.RNAoutput_cdt = CompoundDatatype(user=case.myUser)
     case.RNAoutput_cdt.save()
-    case.RNAoutput_cdt.members.create(
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.RNAoutput_cdt,
         datatype=case.RNA_dt,
         column_name="ComplementedSeq",
-        column_idx=1)
+        column_idx=1))
     case.RNAoutput_cdt.grant_everyone_access()
-    case.RNAoutput_cdt.full_clean()
-    case.RNAoutput_cdt.save()
 
     ####
     # Everything above this point is used in metadata.tests.
@@ -222,22 +246,28 @@ def create_metadata_test_environment(case):
     # Define "tuple" CDT containing (x,y): members x and y exist at index 1 and 2
     case.tuple_cdt = CompoundDatatype(user=case.myUser)
     case.tuple_cdt.save()
-    case.tuple_cdt.members.create(datatype=case.string_dt, column_name="x", column_idx=1)
-    case.tuple_cdt.members.create(datatype=case.string_dt, column_name="y", column_idx=2)
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.tuple_cdt, datatype=case.string_dt, column_name="x", column_idx=1))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.tuple_cdt, datatype=case.string_dt, column_name="y", column_idx=2))
     case.tuple_cdt.grant_everyone_access()
 
     # Define "singlet" CDT containing CDT member (a) and "triplet" CDT with members (a,b,c)
     case.singlet_cdt = CompoundDatatype(user=case.myUser)
     case.singlet_cdt.save()
-    case.singlet_cdt.members.create(
-        datatype=case.string_dt, column_name="k", column_idx=1)
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.singlet_cdt,
+        datatype=case.string_dt, column_name="k", column_idx=1))
     case.singlet_cdt.grant_everyone_access()
 
     case.triplet_cdt = CompoundDatatype(user=case.myUser)
     case.triplet_cdt.save()
-    case.triplet_cdt.members.create(datatype=case.string_dt, column_name="a", column_idx=1)
-    case.triplet_cdt.members.create(datatype=case.string_dt, column_name="b", column_idx=2)
-    case.triplet_cdt.members.create(datatype=case.string_dt, column_name="c", column_idx=3)
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.triplet_cdt, datatype=case.string_dt, column_name="a", column_idx=1))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.triplet_cdt, datatype=case.string_dt, column_name="b", column_idx=2))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.triplet_cdt, datatype=case.string_dt, column_name="c", column_idx=3))
     case.triplet_cdt.grant_everyone_access()
 
     ####
@@ -246,17 +276,23 @@ def create_metadata_test_environment(case):
     # Define CDT "triplet_squares_cdt" with 3 members for use as an input/output
     case.triplet_squares_cdt = CompoundDatatype(user=case.myUser)
     case.triplet_squares_cdt.save()
-    case.triplet_squares_cdt.members.create(datatype=case.string_dt, column_name="a^2", column_idx=1)
-    case.triplet_squares_cdt.members.create(datatype=case.string_dt, column_name="b^2", column_idx=2)
-    case.triplet_squares_cdt.members.create(datatype=case.string_dt, column_name="c^2", column_idx=3)
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.triplet_squares_cdt, datatype=case.string_dt, column_name="a^2", column_idx=1))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.triplet_squares_cdt, datatype=case.string_dt, column_name="b^2", column_idx=2))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.triplet_squares_cdt, datatype=case.string_dt, column_name="c^2", column_idx=3))
     case.triplet_squares_cdt.grant_everyone_access()
 
     # A CDT with mixed Datatypes
     case.mix_triplet_cdt = CompoundDatatype(user=case.myUser)
     case.mix_triplet_cdt.save()
-    case.mix_triplet_cdt.members.create(datatype=case.string_dt, column_name="StrCol1", column_idx=1)
-    case.mix_triplet_cdt.members.create(datatype=case.DNA_dt, column_name="DNACol2", column_idx=2)
-    case.mix_triplet_cdt.members.create(datatype=case.string_dt, column_name="StrCol3", column_idx=3)
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.mix_triplet_cdt, datatype=case.string_dt, column_name="StrCol1", column_idx=1))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.mix_triplet_cdt, datatype=case.DNA_dt, column_name="DNACol2", column_idx=2))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.mix_triplet_cdt, datatype=case.string_dt, column_name="StrCol3", column_idx=3))
     case.mix_triplet_cdt.grant_everyone_access()
 
     # Define CDT "doublet_cdt" same as tuple: x, y
@@ -269,17 +305,31 @@ def create_metadata_test_environment(case):
     # October 15: more CDTs.
     case.DNA_triplet_cdt = CompoundDatatype(user=case.myUser)
     case.DNA_triplet_cdt.save()
-    case.DNA_triplet_cdt.members.create(datatype=case.DNA_dt, column_name="a", column_idx=1)
-    case.DNA_triplet_cdt.members.create(datatype=case.DNA_dt, column_name="b", column_idx=2)
-    case.DNA_triplet_cdt.members.create(datatype=case.DNA_dt, column_name="c", column_idx=3)
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.DNA_triplet_cdt, datatype=case.DNA_dt, column_name="a", column_idx=1))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.DNA_triplet_cdt, datatype=case.DNA_dt, column_name="b", column_idx=2))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.DNA_triplet_cdt, datatype=case.DNA_dt, column_name="c", column_idx=3))
     case.DNA_triplet_cdt.grant_everyone_access()
 
     case.DNA_doublet_cdt = CompoundDatatype(user=case.myUser)
     case.DNA_doublet_cdt.save()
-    case.DNA_doublet_cdt.members.create(datatype=case.DNA_dt, column_name="x", column_idx=1)
-    case.DNA_doublet_cdt.members.create(datatype=case.DNA_dt, column_name="y", column_idx=2)
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.DNA_doublet_cdt, datatype=case.DNA_dt, column_name="x", column_idx=1))
+    members.append(CompoundDatatypeMember(
+        compounddatatype=case.DNA_doublet_cdt, datatype=case.DNA_dt, column_name="y", column_idx=2))
     case.DNA_doublet_cdt.grant_everyone_access()
 
+    CompoundDatatypeMember.objects.bulk_create(members)
+    for cdt in (case.basic_cdt,
+                case.test_cdt,
+                case.DNAinput_cdt,
+                case.DNAoutput_cdt,
+                case.RNAinput_cdt,
+                case.RNAoutput_cdt):
+        cdt.full_clean()
+
 
 def load_metadata_test_environment(case):
     case.myUser = User.objects.get(username='john')
@@ -331,11 +381,30 @@ def load_metadata_test_environment(case):
         members__column_name='x')
 
 
-def clean_up_all_files():
+def list_file_owners():
+    """
+    Record which objects with FileFields currently exist.
+
+    Pass the result to clean_up_all_files() to leave their files alone, for
+    example when the objects were created once in setUpTestData().
+    """
+    return {model: set(model.objects.values_list("pk", flat=True))
+            for model in (CodeResourceRevision, Dataset, MethodOutput, VerificationLog)}
+
+
+def clean_up_all_files(keep=None):
     """
     Delete all files that have been put into the database as FileFields.
+
+    keep is an optional result from list_file_owners(); those objects and
+    their files are not deleted.
     """
-    for crr in CodeResourceRevision.objects.all():
+    def new_objects(model):
+        if keep is None:
+            return model.objects.all()
+        return model.objects.exclude(pk__in=keep[model])
+
+    for crr in new_objects(CodeResourceRevision):
         # Remember that this can be empty.
         # if crr.content_file != None:
         #     crr.content_file.delete()
@@ -350,19 +419,19 @@ def clean_up_all_files():
 
     # Also clear all datasets.  This was previously in librarian.tests
     # but we move it here.
-    for dataset in Dataset.objects.all():
+    for dataset in new_objects(Dataset):
         dataset.dataset_file.close()
         dataset.dataset_file.delete()
         dataset.delete()
 
-    for mo in MethodOutput.objects.all():
+    for mo in new_objects(MethodOutput):
         mo.output_log.close()
         mo.output_log.delete()
         mo.error_log.close()
         mo.error_log.delete()
         mo.delete()
 
-    for vl in VerificationLog.objects.all():
+    for vl in new_objects(VerificationLog):
         vl.output_log.close()
         vl.output_log.delete()
         vl.error_log.close()
@@ -389,16 +458,15 @@ def create_eric_martin_test_environment(case):
         filename="generic_script.py", user=case.myUser)
     case.generic_cr.save()
     case.generic_cr.grant_everyone_access()
-    with open(os.path.join(samplecode_path, "generic_script.py"), "rb") as f:
-        case.generic_crRev = CodeResourceRevision(
-            coderesource=case.generic_cr,
-            revision_name="v1",
-            revision_desc="desc",
-            user=case.myUser,
-            content_file=File(f)
-        )
-        case.generic_crRev.clean()
-        case.generic_crRev.save()
+    case.generic_crRev = CodeResourceRevision(
+        coderesource=case.generic_cr,
+        revision_name="v1",
+        revision_desc="desc",
+        user=case.myUser,
+        content_file=sample_file("generic_script.py")
+    )
+    case.generic_crRev.clean()
+    case.generic_crRev.save()
     case.generic_crRev.grant_everyone_access()
 
     # Method family, methods, and their input/outputs
@@ -411,10 +479,11 @@ def create_eric_martin_test_environment(case):
                      user=case.myUser)
     case.mA.save()
     case.mA.grant_everyone_access()
-    case.A1_rawin = case.mA.create_input(dataset_name="A1_rawin", dataset_idx=1)
+    case.A1_rawin = case.mA.create_input(dataset_name="A1_rawin", dataset_idx=1, clean=False)
     case.A1_out = case.mA.create_output(compounddatatype=case.doublet_cdt,
                                         dataset_name="A1_out",
-                                        dataset_idx=1)
+                                        dataset_idx=1,
+                                        clean=False)
 
     case.mB = Method(revision_name="mB_name", revision_desc="B_desc", family=case.mf, driver=case.generic_crRev,
                      user=case.myUser)
@@ -422,14 +491,17 @@ def create_eric_martin_test_environment(case):
     case.mB.grant_everyone_access()
     case.B1_in = case.mB.create_input(compounddatatype=case.doublet_cdt,
                                       dataset_name="B1_in",
-                                      dataset_idx=1)
+                                      dataset_idx=1,
+                                      clean=False)
     case.B2_in = case.mB.create_input(compounddatatype=case.singlet_cdt,
                                       dataset_name="B2_in",
-                                      dataset_idx=2)
+                                      dataset_idx=2,
+                                      clean=False)
     case.B1_out = case.mB.create_output(compounddatatype=case.triplet_cdt,
                                         dataset_name="B1_out",
                                         dataset_idx=1,
-                                        max_row=5)
+                                        max_row=5,
+                                        clean=False)
 
     case.mC = Method(revision_name="mC_name", revision_desc="C_desc", family=case.mf, driver=case.generic_crRev,
                      user=case.myUser)
@@ -437,17 +509,22 @@ def create_eric_martin_test_environment(case):
     case.mC.grant_everyone_access()
     case.C1_in = case.mC.create_input(compounddatatype=case.triplet_cdt,
                                       dataset_name="C1_in",
-                                      dataset_idx=1)
+                                      dataset_idx=1,
+                                      clean=False)
     case.C2_in = case.mC.create_input(compounddatatype=case.doublet_cdt,
                                       dataset_name="C2_in",
-                                      dataset_idx=2)
+                                      dataset_idx=2,
+                                      clean=False)
     case.C1_out = case.mC.create_output(compounddatatype=case.singlet_cdt,
                                         dataset_name="C1_out",
-                                        dataset_idx=1)
+                                        dataset_idx=1,
+                                        clean=False)
     case.C2_rawout = case.mC.create_output(dataset_name="C2_rawout",
-                                           dataset_idx=2)
+                                           dataset_idx=2,
+                                           clean=False)
     case.C3_rawout = case.mC.create_output(dataset_name="C3_rawout",
-                                           dataset_idx=3)
+                                           dataset_idx=3,
+                                           clean=False)
 
     # Pipeline family, pipelines, and their input/outputs
     case.pf = PipelineFamily(name="Pipeline_family", description="PF desc", user=case.myUser)
@@ -458,22 +535,27 @@ def create_eric_martin_test_environment(case):
     case.pD.grant_everyone_access()
     case.D1_in = case.pD.create_input(compounddatatype=case.doublet_cdt,
                                       dataset_name="D1_in",
-                                      dataset_idx=1)
+                                      dataset_idx=1,
+                                      clean=False)
     case.D2_in = case.pD.create_input(compounddatatype=case.singlet_cdt,
                                       dataset_name="D2_in",
-                                      dataset_idx=2)
+                                      dataset_idx=2,
+                                      clean=False)
     case.pE = Pipeline(family=case.pf, revision_name="pE_name", revision_desc="E", user=case.myUser)
     case.pE.save()
     case.pE.grant_everyone_access()
     case.E1_in = case.pE.create_input(compounddatatype=case.triplet_cdt,
                                       dataset_name="E1_in",
-                                      dataset_idx=1)
+                                      dataset_idx=1,
+                                      clean=False)
     case.E2_in = case.pE.create_input(compounddatatype=case.singlet_cdt,
                                       dataset_name="E2_in",
                                       dataset_idx=2,
-                                      min_row=10)
+                                      min_row=10,
+                                      clean=False)
     case.E3_rawin = case.pE.create_input(dataset_name="E3_rawin",
-                                         dataset_idx=3)
+                                         dataset_idx=3,
+                                         clean=False)
 
     # Pipeline steps
     case.step_D1 = case.pD.steps.create(transformation=case.mB,
@@ -497,8 +579,10 @@ def create_eric_martin_test_environment(case):
                                            output_cdt=case.triplet_cdt,
                                            source_step=1,
                                            source=case.B1_out)
-    case.pD.create_outputs()
-    case.D1_out = case.pD.outputs.get(dataset_name="D1_out")
+    # The outcables are all in hand, so build the outputs from them directly
+    # instead of having create_outputs() query for them again.
+    structures = []
+    case.D1_out = case.D11_21.create_output(structures=structures)
 
     case.E03_11 = case.step_E1.cables_in.create(dest=case.A1_rawin,
                                                 source_step=0,
@@ -515,13 +599,13 @@ def create_eric_martin_test_environment(case):
     case.E21_31 = case.step_E3.cables_in.create(
         dest=case.C1_in,
         source_step=2,
-        source=case.step_E2.transformation.outputs.get(dataset_name="D1_out"))
+        source=case.D1_out)
     case.E21_41 = case.pE.outcables.create(
         output_name="E1_out",
         output_idx=1,
         output_cdt=case.doublet_cdt,
         source_step=2,
-        source=case.step_E2.transformation.outputs.get(dataset_name="D1_out"))
+        source=case.D1_out)
     case.E31_42 = case.pE.outcables.create(output_name="E2_out",
                                            output_idx=2,
                                            output_cdt=case.singlet_cdt,
@@ -532,34 +616,37 @@ def create_eric_martin_test_environment(case):
                                            output_cdt=None,
                                            source_step=3,
                                            source=case.C3_rawout)
-    case.pE.create_outputs()
-    case.E1_out = case.pE.outputs.get(dataset_name="E1_out")
-    case.E2_out = case.pE.outputs.get(dataset_name="E2_out")
-    case.E3_rawout = case.pE.outputs.get(dataset_name="E3_rawout")
+    case.E1_out = case.E21_41.create_output(structures=structures)
+    case.E2_out = case.E31_42.create_output(structures=structures)
+    case.E3_rawout = case.E33_43.create_output(structures=structures)
+    XputStructure.objects.bulk_create(structures)
 
     # Custom wiring/outwiring
+    triplet_pins = {member.column_idx: member for member in case.triplet_cdt.members.all()}
+    doublet_pins = {member.column_idx: member for member in case.doublet_cdt.members.all()}
     case.E01_21_wire1 = case.E01_21.custom_wires.create(
-        source_pin=case.triplet_cdt.members.get(column_idx=1), dest_pin=case.doublet_cdt.members.get(column_idx=2))
+        source_pin=triplet_pins[1], dest_pin=doublet_pins[2])
     case.E01_21_wire2 = case.E01_21.custom_wires.create(
-        source_pin=case.triplet_cdt.members.get(column_idx=3), dest_pin=case.doublet_cdt.members.get(column_idx=1))
+        source_pin=triplet_pins[3], dest_pin=doublet_pins[1])
     case.E11_32_wire1 = case.E11_32.custom_wires.create(
-        source_pin=case.doublet_cdt.members.get(column_idx=1), dest_pin=case.doublet_cdt.members.get(column_idx=2))
+        source_pin=doublet_pins[1], dest_pin=doublet_pins[2])
     case.E11_32_wire2 = case.E11_32.custom_wires.create(
-        source_pin=case.doublet_cdt.members.get(column_idx=2), dest_pin=case.doublet_cdt.members.get(column_idx=1))
+        source_pin=doublet_pins[2], dest_pin=doublet_pins[1])
     case.E21_41_wire1 = case.E21_41.custom_wires.create(
-        source_pin=case.triplet_cdt.members.get(column_idx=2), dest_pin=case.doublet_cdt.members.get(column_idx=2))
+        source_pin=triplet_pins[2], dest_pin=doublet_pins[2])
     case.E21_41_wire2 = case.E21_41.custom_wires.create(
-        source_pin=case.triplet_cdt.members.get(column_idx=3), dest_pin=case.doublet_cdt.members.get(column_idx=1))
+        source_pin=triplet_pins[3], dest_pin=doublet_pins[1])
     case.pE.clean()
 
     # November 7, 2013: use a helper function (defined in
     # librarian.models) to define our Datasets.
 
     # Define singlet, doublet, triplet, and raw uploaded datasets
+    everyone = everyone_group()
     case.triplet_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "step_0_triplet.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.triplet_cdt,
         keep_file=True,
         name="triplet",
@@ -570,7 +657,7 @@ def create_eric_martin_test_environment(case):
     case.doublet_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "doublet_cdt.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.doublet_cdt,
         name="doublet",
         description="lol"
@@ -580,7 +667,7 @@ def create_eric_martin_test_environment(case):
     case.singlet_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "singlet_cdt_large.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.singlet_cdt,
         name="singlet",
         description="lol"
@@ -590,7 +677,7 @@ def create_eric_martin_test_environment(case):
     case.singlet_3rows_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "step_0_singlet.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.singlet_cdt,
         name="singlet",
         description="lol"
@@ -600,7 +687,7 @@ def create_eric_martin_test_environment(case):
     case.raw_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "step_0_raw.fasta"),
         user=case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=None,
         name="raw_DS",
         description="lol"
@@ -612,7 +699,7 @@ def create_eric_martin_test_environment(case):
     case.D1_in_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "doublet_remuxed_from_triplet.csv"),
         user=case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.doublet_cdt,
         name="D1_in_doublet",
         keep_file=False
@@ -622,7 +709,7 @@ def create_eric_martin_test_environment(case):
     case.C1_in_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "C1_in_triplet.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.triplet_cdt,
         name="C1_in_triplet",
         description="triplet 3 rows"
@@ -634,7 +721,7 @@ def create_eric_martin_test_environment(case):
     case.C2_in_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "E11_32_output.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.doublet_cdt,
         keep_file=False,
         name="C2_in_doublet"
@@ -645,7 +732,7 @@ def create_eric_martin_test_environment(case):
     case.E11_32_output_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "E11_32_output.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.doublet_cdt,
         name="E11_32 output doublet",
         description="result of E11_32 fed by doublet_cdt.csv"
@@ -655,7 +742,7 @@ def create_eric_martin_test_environment(case):
     case.C1_out_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "step_0_singlet.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.singlet_cdt,
         name="raw",
         description="lol"
@@ -665,7 +752,7 @@ def create_eric_martin_test_environment(case):
     case.C2_out_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "step_0_raw.fasta"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=None,
         name="C2_out",
         description="lol"
@@ -674,7 +761,7 @@ def create_eric_martin_test_environment(case):
     case.C3_out_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "step_0_raw.fasta"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=None,
         name="C3_out",
         description="lol"
@@ -683,7 +770,7 @@ def create_eric_martin_test_environment(case):
     case.triplet_3_rows_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "step_0_triplet_3_rows.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.triplet_cdt,
         name="triplet",
         description="lol"
@@ -694,7 +781,7 @@ def create_eric_martin_test_environment(case):
     case.E1_out_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "doublet_remuxed_from_t3r.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.doublet_cdt,
         name="E1_out",
         description="doublet remuxed from triplet"
@@ -706,7 +793,7 @@ def create_eric_martin_test_environment(case):
     case.DNA_triplet_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "DNA_triplet.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.DNA_triplet_cdt,
         name="DNA_triplet",
         description="DNA triplet data"
@@ -716,7 +803,7 @@ def create_eric_martin_test_environment(case):
     case.E01_21_DNA_doublet_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "E01_21_DNA_doublet.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.DNA_doublet_cdt,
         name="E01_21_DNA_doublet",
         description="DNA doublet data coming from DNA_triplet.csv but remultiplexed according to cable E01_21"
@@ -726,7 +813,7 @@ def create_eric_martin_test_environment(case):
     case.E21_41_DNA_doublet_dataset = Dataset.create_dataset(
         os.path.join(samplecode_path, "E21_41_DNA_doublet.csv"),
         case.myUser,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.DNA_doublet_cdt,
         name="E21_41_DNA_doublet",
         description="DNA doublet data coming from DNA_triplet.csv but remultiplexed according to cable E21_41"
@@ -746,25 +833,30 @@ def load_eric_martin_test_environment(case):
     case.A1_out = case.mA.outputs.get()
 
     case.mB = Method.objects.get(revision_name="mB_name")
-    case.B1_in = case.mB.inputs.get(dataset_name="B1_in")
-    case.B2_in = case.mB.inputs.get(dataset_name="B2_in")
+    B_inputs = {xput.dataset_name: xput for xput in case.mB.inputs.all()}
+    case.B1_in = B_inputs["B1_in"]
+    case.B2_in = B_inputs["B2_in"]
     case.B1_out = case.mB.outputs.get()
 
     case.mC = Method.objects.get(revision_name="mC_name")
-    case.C1_in = case.mC.inputs.get(dataset_name="C1_in")
-    case.C2_in = case.mC.inputs.get(dataset_name="C2_in")
-    case.C1_out = case.mC.outputs.get(dataset_name="C1_out")
-    case.C2_rawout = case.mC.outputs.get(dataset_name="C2_rawout")
-    case.C3_rawout = case.mC.outputs.get(dataset_name="C3_rawout")
+    C_inputs = {xput.dataset_name: xput for xput in case.mC.inputs.all()}
+    case.C1_in = C_inputs["C1_in"]
+    case.C2_in = C_inputs["C2_in"]
+    C_outputs = {xput.dataset_name: xput for xput in case.mC.outputs.all()}
+    case.C1_out = C_outputs["C1_out"]
+    case.C2_rawout = C_outputs["C2_rawout"]
+    case.C3_rawout = C_outputs["C3_rawout"]
 
     case.pf = PipelineFamily.objects.get(name="Pipeline_family")
     case.pD = Pipeline.objects.get(revision_name="pD_name")
-    case.D1_in = case.pD.inputs.get(dataset_name="D1_in")
-    case.D2_in = case.pD.inputs.get(dataset_name="D2_in")
+    D_inputs = {xput.dataset_name: xput for xput in case.pD.inputs.all()}
+    case.D1_in = D_inputs["D1_in"]
+    case.D2_in = D_inputs["D2_in"]
     case.pE = Pipeline.objects.get(revision_name="pE_name")
-    case.E1_in = case.pE.inputs.get(dataset_name="E1_in")
-    case.E2_in = case.pE.inputs.get(dataset_name="E2_in")
-    case.E3_rawin = case.pE.inputs.get(dataset_name="E3_rawin")
+    E_inputs = {xput.dataset_name: xput for xput in case.pE.inputs.all()}
+    case.E1_in = E_inputs["E1_in"]
+    case.E2_in = E_inputs["E2_in"]
+    case.E3_rawin = E_inputs["E3_rawin"]
 
     case.step_D1 = case.pD.steps.get(step_num=1)
     case.step_E1 = case.pE.steps.get(step_num=1)
@@ -781,39 +873,40 @@ def load_eric_martin_test_environment(case):
     case.E02_22 = case.step_E2.cables_in.get(dest=case.D2_in)
     case.E11_32 = case.step_E3.cables_in.get(dest=case.C2_in)
     case.E21_31 = case.step_E3.cables_in.get(dest=case.C1_in)
-    case.E21_41 = case.pE.outcables.get(output_name="E1_out")
-    case.E31_42 = case.pE.outcables.get(output_name="E2_out")
-    case.E33_43 = case.pE.outcables.get(output_name="E3_rawout")
-    case.E1_out = case.pE.outputs.get(dataset_name="E1_out")
-    case.E2_out = case.pE.outputs.get(dataset_name="E2_out")
-    case.E3_rawout = case.pE.outputs.get(dataset_name="E3_rawout")
-
+    E_outcables = {outcable.output_name: outcable for outcable in case.pE.outcables.all()}
+    case.E21_41 = E_outcables["E1_out"]
+    case.E31_42 = E_outcables["E2_out"]
+    case.E33_43 = E_outcables["E3_rawout"]
+    E_outputs = {xput.dataset_name: xput for xput in case.pE.outputs.all()}
+    case.E1_out = E_outputs["E1_out"]
+    case.E2_out = E_outputs["E2_out"]
+    case.E3_rawout = E_outputs["E3_rawout"]
+
+    triplet_pins = {member.column_idx: member for member in case.triplet_cdt.members.all()}
+    doublet_pins = {member.column_idx: member for member in case.doublet_cdt.members.all()}
     case.E01_21_wire1 = case.E01_21.custom_wires.get(
-        source_pin=case.triplet_cdt.members.get(column_idx=1))
+        source_pin=triplet_pins[1])
     case.E01_21_wire2 = case.E01_21.custom_wires.get(
-        source_pin=case.triplet_cdt.members.get(column_idx=3))
+        source_pin=triplet_pins[3])
     case.E11_32_wire1 = case.E11_32.custom_wires.get(
-        source_pin=case.doublet_cdt.members.get(column_idx=1))
+        source_pin=doublet_pins[1])
     case.E11_32_wire2 = case.E11_32.custom_wires.get(
-        source_pin=case.doublet_cdt.members.get(column_idx=2))
+        source_pin=doublet_pins[2])
     case.E21_41_wire1 = case.E21_41.custom_wires.get(
-        source_pin=case.triplet_cdt.members.get(column_idx=2))
+        source_pin=triplet_pins[2])
     case.E21_41_wire2 = case.E21_41.custom_wires.get(
-        source_pin=case.triplet_cdt.members.get(column_idx=3))
+        source_pin=triplet_pins[3])
 
-    case.triplet_dataset = Dataset.objects.get(
-        name="triplet",
-        dataset_file__endswith="step_0_triplet.csv")
+    # Two Datasets are named "triplet" and two "singlet", so reload them by
+    # the keys that create_eric_martin_test_environment() left on the class.
+    case.triplet_dataset = Dataset.objects.get(pk=case.triplet_dataset.pk)
     case.triplet_dataset_structure = case.triplet_dataset.structure
     case.doublet_dataset = Dataset.objects.get(name="doublet")
     case.doublet_dataset_structure = case.doublet_dataset.structure
-    case.singlet_dataset = Dataset.objects.get(
-        name="singlet",
-        dataset_file__endswith="singlet_cdt_large.csv")
+    case.singlet_dataset = Dataset.objects.get(pk=case.singlet_dataset.pk)
     case.singlet_dataset_structure = case.singlet_dataset.structure
     case.singlet_3rows_dataset = Dataset.objects.get(
-        name="singlet",
-        dataset_file__endswith="step_0_singlet.csv")
+        pk=case.singlet_3rows_dataset.pk)
     case.singlet_3rows_dataset_structure = case.singlet_3rows_dataset.structure
     case.raw_dataset = Dataset.objects.get(name="raw_DS")
 
@@ -838,8 +931,7 @@ def load_eric_martin_test_environment(case):
     case.C3_out_dataset = Dataset.objects.get(name="C3_out")
 
     case.triplet_3_rows_dataset = Dataset.objects.get(
-        name="triplet",
-        dataset_file__endswith="step_0_triplet_3_rows.csv")
+        pk=case.triplet_3_rows_dataset.pk)
     case.triplet_3_rows_dataset_structure = case.triplet_3_rows_dataset.structure
     case.E1_out_dataset = Dataset.objects.get(name="E1_out")
     case.E1_out_dataset_structure = case.E1_out_dataset.structure
@@ -1152,29 +1244,27 @@ def create_method_test_environment(case):
 
     # Define compv1_crRev for comp_cr
     fn = "complement.py"
-    with open(os.path.join(samplecode_path, fn), "rb") as f:
-        case.compv1_crRev = CodeResourceRevision(
-            coderesource=case.comp_cr,
-            revision_name="v1",
-            revision_desc="First version",
-            content_file=File(f),
-            user=case.myUser)
-        case.compv1_crRev.full_clean()
-        case.compv1_crRev.save()
+    case.compv1_crRev = CodeResourceRevision(
+        coderesource=case.comp_cr,
+        revision_name="v1",
+        revision_desc="First version",
+        content_file=sample_file(fn),
+        user=case.myUser)
+    case.compv1_crRev.full_clean()
+    case.compv1_crRev.save()
     case.compv1_crRev.grant_everyone_access()
 
     # Define compv2_crRev for comp_cr
     fn = "complement_v2.py"
-    with open(os.path.join(samplecode_path, fn), "rb") as f:
-        case.compv2_crRev = CodeResourceRevision(
-            coderesource=case.comp_cr,
-            revision_name="v2",
-            revision_desc="Second version: better docstring",
-            revision_parent=case.compv1_crRev,
-            content_file=File(f),
-            user=case.myUser)
-        case.compv2_crRev.full_clean()
-        case.compv2_crRev.save()
+    case.compv2_crRev = CodeResourceRevision(
+        coderesource=case.comp_cr,
+        revision_name="v2",
+        revision_desc="Second version: better docstring",
+        revision_parent=case.compv1_crRev,
+        content_file=sample_file(fn),
+        user=case.myUser)
+    case.compv2_crRev.full_clean()
+    case.compv2_crRev.save()
     case.compv2_crRev.grant_everyone_access()
 
     # Define DNA reference to use as a dependency
@@ -1186,15 +1276,14 @@ def create_method_test_environment(case):
     dna_resource.save()
     dna_resource.grant_everyone_access()
     fn = "GoodDNANucSeq.csv"
-    with open(os.path.join(samplecode_path, fn), "rb") as f:
-        dna_resource_revision = CodeResourceRevision(
-            coderesource=dna_resource,
-            revision_name="Prototype",
-            revision_desc="Reference DNA sequences",
-            content_file=File(f),
-            user=case.myUser)
-        dna_resource_revision.full_clean()
-        dna_resource_revision.save()
+    dna_resource_revision = CodeResourceRevision(
+        coderesource=dna_resource,
+        revision_name="Prototype",
+        revision_desc="Reference DNA sequences",
+        content_file=sample_file(fn),
+        user=case.myUser)
+    dna_resource_revision.full_clean()
+    dna_resource_revision.save()
     dna_resource_revision.grant_everyone_access()
 
     # The following is for testing code resource dependencies.
@@ -1375,16 +1464,15 @@ def create_method_test_environment(case):
 
     # Add code resource revision for code resource (script_1_sum_and_products )
     fn = "script_1_sum_and_products.py"
-    with open(os.path.join(samplecode_path, fn), "rb") as f:
-        case.script_1_crRev = CodeResourceRevision(
-            coderesource=case.script_1_cr,
-            revision_name="v1",
-            revision_desc="First version",
-            user=case.myUser,
-            content_file=File(f)
-        )
-        case.script_1_crRev.full_clean()
-        case.script_1_crRev.save()
+    case.script_1_crRev = CodeResourceRevision(
+        coderesource=case.script_1_cr,
+        revision_name="v1",
+        revision_desc="First version",
+        user=case.myUser,
+        content_file=sample_file(fn)
+    )
+    case.script_1_crRev.full_clean()
+    case.script_1_crRev.save()
     case.script_1_crRev.grant_everyone_access()
 
     # Establish code resource revision as a method
@@ -1420,15 +1508,14 @@ def create_method_test_environment(case):
 
     # Add code resource revision for code resource (script_2_square_and_means)
     fn = "script_2_square_and_means.py"
-    with open(os.path.join(samplecode_path, fn), "rb") as f:
-        case.script_2_crRev = CodeResourceRevision(
-            coderesource=case.script_2_cr,
-            revision_name="v1",
-            revision_desc="First version",
-            user=case.myUser,
-            content_file=File(f))
-        case.script_2_crRev.full_clean()
-        case.script_2_crRev.save()
+    case.script_2_crRev = CodeResourceRevision(
+        coderesource=case.script_2_cr,
+        revision_name="v1",
+        revision_desc="First version",
+        user=case.myUser,
+        content_file=sample_file(fn))
+    case.script_2_crRev.full_clean()
+    case.script_2_crRev.save()
     case.script_2_crRev.grant_everyone_access()
 
     # Establish code resource revision as a method
@@ -1469,15 +1556,14 @@ def create_method_test_environment(case):
     case.script_3_cr.grant_everyone_access()
 
     # Add code resource revision for code resource (script_3_product)
-    with open(os.path.join(samplecode_path, "script_3_product.py"), "rb") as f:
-        case.script_3_crRev = CodeResourceRevision(
-            coderesource=case.script_3_cr,
-            revision_name="v1",
-            revision_desc="First version",
-            content_file=File(f),
-            user=case.myUser)
-        case.script_3_crRev.full_clean()
-        case.script_3_crRev.save()
+    case.script_3_crRev = CodeResourceRevision(
+        coderesource=case.script_3_cr,
+        revision_name="v1",
+        revision_desc="First version",
+        content_file=sample_file("script_3_product.py"),
+        user=case.myUser)
+    case.script_3_crRev.full_clean()
+    case.script_3_crRev.save()
     case.script_3_crRev.grant_everyone_access()
 
     # Establish code resource revision as a method
@@ -1558,15 +1644,14 @@ def create_method_test_environment(case):
     case.script_4_CR.grant_everyone_access()
 
     # Define CRR for this CR in order to define method
-    with open(os.path.join(samplecode_path, "script_4_raw_in_CSV_out.py"), "rb") as f:
-        case.script_4_1_CRR = CodeResourceRevision(
-            coderesource=case.script_4_CR,
-            revision_name="v1",
-            revision_desc="v1",
-            content_file=File(f),
-            user=case.myUser)
-        case.script_4_1_CRR.full_clean()
-        case.script_4_1_CRR.save()
+    case.script_4_1_CRR = CodeResourceRevision(
+        coderesource=case.script_4_CR,
+        revision_name="v1",
+        revision_desc="v1",
+        content_file=sample_file("script_4_raw_in_CSV_out.py"),
+        user=case.myUser)
+    case.script_4_1_CRR.full_clean()
+    case.script_4_1_CRR.save()
     case.script_4_1_CRR.grant_everyone_access()
 
     # Define MF in order to define method
@@ -1983,6 +2068,7 @@ def create_word_reversal_environment(case):
         case.user_bob)
     simple_method_io(case.method_noop_backwords, case.cdt_backwords, "backwords", "more_backwords")
 
+    everyone = everyone_group()
     # Some data of type (case.datatype_str: word).
     string_datafile = tempfile.NamedTemporaryFile(delete=False)
     string_datafile.write("word\n".encode())
@@ -1992,7 +2078,7 @@ def create_word_reversal_environment(case):
     case.dataset_words = Dataset.create_dataset(
         file_path=string_datafile.name,
         user=case.user_bob,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.cdt_string,
         keep_file=True,
         name="blahblah",
@@ -2030,7 +2116,7 @@ def create_word_reversal_environment(case):
     case.dataset_wordbacks = Dataset.create_dataset(
         file_path=case.wordbacks_datafile.name,
         user=case.user_bob,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.cdt_wordbacks,
         keep_file=True,
         name="wordbacks",
@@ -2040,7 +2126,7 @@ def create_word_reversal_environment(case):
     case.dataset_backwords = Dataset.create_dataset(
         file_path=case.backwords_datafile.name,
         user=case.user_bob,
-        groups_allowed=[everyone_group()],
+        groups_allowed=[everyone],
         cdt=case.cdt_backwords,
         keep_file=True,
         name="backwords",
@@ -2061,10 +2147,10 @@ def make_crisscross_cable(cable):
     """
     source_cdt = cable.source.structure.compounddatatype
     dest_cdt = cable.dest.structure.compounddatatype
-    cable.custom_wires.create(source_pin=source_cdt.members.get(column_idx=1),
-                              dest_pin=dest_cdt.members.get(column_idx=2))
-    cable.custom_wires.create(source_pin=source_cdt.members.get(column_idx=2),
-                              dest_pin=dest_cdt.members.get(column_idx=1))
+    source_pins = {member.column_idx: member for member in source_cdt.members.all()}
+    dest_pins = {member.column_idx: member for member in dest_cdt.members.all()}
+    cable.custom_wires.create(source_pin=source_pins[1], dest_pin=dest_pins[2])
+    cable.custom_wires.create(source_pin=source_pins[2], dest_pin=dest_pins[1])
 
 
 def new_datatype(dtname, dtdesc, kivetype, user, grant_everyone_access=True):
@@ -2322,7 +2408,6 @@ def create_grandpa_sandbox_environment(case):
         name="numbers",
         description="numbers which are actually strings"
     )
-    case.dataset_grandpa.clean()
 
 
 def destroy_grandpa_sandbox_environment(case):
@@ -3,6 +3,7 @@ import os
 import os.path
 from django.test import TestCase
 
+import hashlib
 import tempfile
 import shutil
 import file_access_utils as utils
@@ -73,3 +74,59 @@ test
         os.mkfifo(test_fname1, 0x644)
         with self.assertRaises(shutil.SpecialFileError):
             COPY_FILE(test_fname1, test_fname2)
+
+    def test_chunk_checksums(self):
+        "Each chunk's checksum should match the checksum of that slice"
+        cont_bytes = self.small_bytes
+        writebinfile(self.test_fname1, cont_bytes)
+        expected_checksums = [hashlib.md5(cont_bytes[i:i+5]).hexdigest()
+                              for i in range(0, len(cont_bytes), 5)]
+
+        checksums = utils.compute_chunk_checksums(self.test_fname1, "md5", chunk_size=5)
+
+        self.assertEqual(expected_checksums, checksums)
+
+    def test_chunk_checksums_in_this_thread(self):
+        "Checksums should be the same without a pool of threads"
+        cont_bytes = self.small_bytes
+        writebinfile(self.test_fname1, cont_bytes)
+        expected_checksums = utils.compute_chunk_checksums(self.test_fname1, "md5", chunk_size=5)
+
+        checksums = utils.compute_chunk_checksums(self.test_fname1,
+                                                  "md5",
+                                                  chunk_size=5,
+                                                  max_workers=1)
+
+        self.assertEqual(expected_checksums, checksums)
+
+    def test_chunked_checksum(self):
+        "Data passed in pieces should match the MD5 and the chunk checksums"
+        cont_bytes = self.small_bytes
+        writebinfile(self.test_fname1, cont_bytes)
+        expected_checksums = utils.compute_chunk_checksums(self.test_fname1, "md5", chunk_size=5)
+        checksum = utils.ChunkedChecksum("md5", chunk_size=5)
+
+        for i in range(0, len(cont_bytes), 7):
+            checksum.update(cont_bytes[i:i+7])
+
+        self.assertEqual(hashlib.md5(cont_bytes).hexdigest(), checksum.hexdigest())
+        self.assertEqual(expected_checksums, checksum.chunk_hexdigests())
+        self.assertEqual(len(cont_bytes), checksum.size)
+
+    def test_md5_from_path(self):
+        "Checksum from a path should match the checksum from a file handle"
+        writebinfile(self.test_fname1, self.small_bytes)
+        with open(self.test_fname1, 'rb') as f:
+            expected_md5 = utils.compute_md5(f)
+
+        md5 = utils.compute_md5_from_path(self.test_fname1, chunk_size=5)
+
+        self.assertEqual(expected_md5, md5)
+
+    def test_md5_from_path_empty(self):
+        "An empty file should still get a checksum"
+        writebinfile(self.test_fname1, b"")
+
+        md5 = utils.compute_md5_from_path(self.test_fname1)
+
+        self.assertEqual(hashlib.md5().hexdigest(), md5)
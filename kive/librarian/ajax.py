@@ -104,7 +104,8 @@ class DatasetViewSet(RemovableModelViewSet,
         compound datatype id, or raw type if id is missing.
     * filters[n][key]=md5&filters[n][val]=match - md5 checksum matches the value
     """
-    queryset = Dataset.objects.all()
+    # The chunk checksums are only needed to verify a file, not to list it.
+    queryset = Dataset.objects.defer("chunk_checksums")
     serializer_class = DatasetSerializer
     permission_classes = (permissions.IsAuthenticated, IsGrantedReadCreate)
     pagination_class = StandardPagination
@@ -112,7 +113,7 @@ class DatasetViewSet(RemovableModelViewSet,
     def filter_granted(self, queryset):
         """ Filter a queryset to only include records explicitly granted.
         """
-        return Dataset.filter_by_user(self.request.user)
+        return Dataset.filter_by_user(self.request.user).defer("chunk_checksums")
 
     def filter_queryset(self, queryset):
         return self.apply_filters(super(DatasetViewSet, self).filter_queryset(queryset))
@@ -86,8 +86,7 @@ class Command(BaseCommand):
 
     def is_md5_changed(self, dataset, found_file, changed_files):
         old_md5 = dataset.MD5_checksum
-        with open(found_file, "rb") as f:
-            new_md5 = file_access_utils.compute_md5(f)
+        new_md5 = file_access_utils.compute_md5_from_path(found_file)
         is_changed = new_md5 != old_md5
         if is_changed:
             if found_file not in changed_files:
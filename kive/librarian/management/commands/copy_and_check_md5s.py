@@ -10,7 +10,7 @@ from traceback import format_exc
 from django.core.management.base import BaseCommand
 from mpi4py import MPI
 
-from file_access_utils import sandbox_base_path, compute_md5
+from file_access_utils import sandbox_base_path, compute_md5_from_path
 from fleet.workers import adjust_log_files
 from librarian.models import Dataset
 
@@ -126,8 +126,7 @@ class Command(BaseCommand):
             return logging.ERROR, 'Dataset file missing: {!r}'.format(source_filename)
 
         shutil.copyfile(source_filename, dest_filename)
-        with open(dest_filename, "rb") as f:
-            new_md5 = compute_md5(f)
+        new_md5 = compute_md5_from_path(dest_filename)
 
         if new_md5 != dataset.MD5_checksum:
             message = 'MD5 check failed on {}, dataset id {}: {!r} expected {}, but was {}.'.format(
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.23 on 2026-10-17 06:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('librarian', '0111_is_uploaded_false'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='chunk_checksums',
+            field=models.TextField(blank=True, default='', help_text='JSON hash algorithm and checksum of each chunk of a large file'),
+        ),
+    ]
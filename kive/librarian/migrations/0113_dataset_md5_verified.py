@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.23 on 2026-10-17 06:21
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('librarian', '0112_dataset_chunk_checksums'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='md5_verified_mtime',
+            field=models.FloatField(blank=True, help_text='Modification time of the file when its MD5 checksum was last verified', null=True),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='md5_verified_time',
+            field=models.DateTimeField(blank=True, help_text="When the file's MD5 checksum was last verified", null=True),
+        ),
+    ]
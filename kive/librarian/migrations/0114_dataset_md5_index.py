@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.23 on 2026-10-17 07:03
+from __future__ import unicode_literals
+
+import django.core.validators
+from django.db import migrations, models
+import re
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('librarian', '0113_dataset_md5_verified'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dataset',
+            name='MD5_checksum',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='Validates file integrity', max_length=64, validators=[django.core.validators.RegexValidator(message='MD5 checksum is not either 32 hex characters or blank', regex=re.compile('(^[0-9A-Fa-f]{32}$)|(^$)', 32))]),
+        ),
+    ]
@@ -9,8 +9,8 @@ from __future__ import unicode_literals
 from collections import defaultdict
 import csv
 from datetime import date, timedelta
-import hashlib
 import itertools
+import json
 import logging
 import os
 import os.path
@@ -19,9 +19,11 @@ import shutil
 import tempfile
 import time
 import io
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 
 from django.contrib.humanize.templatetags.humanize import naturaltime
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.core.exceptions import ValidationError, ObjectDoesNotExist
 from django.core.validators import MinValueValidator, RegexValidator
 from django.core.files import File
@@ -170,9 +172,18 @@ class Dataset(metadata.models.AccessControl):
 
     logger = logging.getLogger('librarian.Dataset')
 
+    # Files are read again after this long, even if they haven't been modified.
+    MD5_REVERIFY_INTERVAL = timedelta(days=30)
+    # Files modified this recently (in seconds) might change again without
+    # changing their modification time, so they aren't marked as verified.
+    MD5_SETTLE_TIME = 2
+
     # For validation of Datasets when being reused, or when being
     # regenerated.  A blank MD5_checksum means that the file was
     # missing (not created when it was supposed to be created).
+    # This stays MD5, even though faster hashes exist: it's displayed to
+    # users, filtered on by the API, and compared with checksums calculated
+    # outside Kive.  The internal chunk_checksums use a faster hash.
     MD5_checksum = models.CharField(
         max_length=64,
         validators=[RegexValidator(
@@ -180,8 +191,27 @@ class Dataset(metadata.models.AccessControl):
             message="MD5 checksum is not either 32 hex characters or blank")],
         blank=True,
         default="",
+        db_index=True,
         help_text="Validates file integrity")
 
+    # Large files also store a checksum of each chunk, so check_md5() can
+    # verify them on several cores.  Blank for small files.
+    chunk_checksums = models.TextField(
+        blank=True,
+        default="",
+        help_text="JSON hash algorithm and checksum of each chunk of a large file")
+
+    # When the MD5 was last verified, and the file's modification time then.
+    # check_md5() skips reading the file if it hasn't been modified since.
+    md5_verified_time = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the file's MD5 checksum was last verified")
+    md5_verified_mtime = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Modification time of the file when its MD5 checksum was last verified")
+
     _redacted = models.BooleanField(default=False)
 
     # The last time a check was performed on this external file, to see whether
@@ -210,6 +240,8 @@ class Dataset(metadata.models.AccessControl):
     def __init__(self, *args, **kwargs):
         super(Dataset, self).__init__(*args, **kwargs)
         self.logger = logging.getLogger(self.__class__.__name__)
+        # The file and checksum that clean() last verified.
+        self._clean_md5_key = None
 
     def __repr__(self):
         return 'Dataset(name={!r})'.format(self.name)
@@ -225,7 +257,8 @@ class Dataset(metadata.models.AccessControl):
 
         display_name = self.name if self.name != "" else "[no name specified]"
 
-        return "{} (created by {} on {})".format(display_name, self.user, self.date_created)
+        # Show the user's id, so displaying a Dataset never queries the user.
+        return "{} (created by user {} on {})".format(display_name, self.user_id, self.date_created)
 
     @property
     def is_purged(self):
@@ -236,6 +269,20 @@ class Dataset(metadata.models.AccessControl):
             return None
         return os.path.normpath(os.path.join(self.externalfiledirectory.path, self.external_path))
 
+    def get_local_path(self):
+        """
+        Path of the data file on the local file system, or None.
+
+        This is None if there is no data file, or if the storage backend
+        doesn't keep its files on the local file system.
+        """
+        if self.dataset_file:
+            try:
+                return self.dataset_file.path
+            except NotImplementedError:
+                return None
+        return self.external_absolute_path()
+
     def get_open_file_handle(self, mode="rb", raise_errors=False):
         """
         Retrieves an open Django file with which to access the data.
@@ -464,7 +511,7 @@ class Dataset(metadata.models.AccessControl):
                 }
             )
 
-        if self.has_data() and not self.check_md5():
+        if self.has_data() and not self._check_md5_once():
             error_str = ('File integrity of "{}" lost. Current checksum "{}" does not equal expected checksum ' +
                          '"{}"').format(self, self.compute_md5(), self.MD5_checksum)
             raise ValidationError(
@@ -473,6 +520,26 @@ class Dataset(metadata.models.AccessControl):
                 }
             )
 
+    def _check_md5_once(self):
+        """ Check the MD5 for clean(), unless it was already checked.
+
+        Creating a Dataset cleans it several times, so this remembers the
+        local file and checksum that passed, until a new file is saved.
+        """
+        file_path = self.get_local_path()
+        try:
+            file_stat = file_path and os.stat(file_path)
+        except OSError:
+            file_stat = None
+        if not file_stat:
+            return self.check_md5(trust_mtime=True)
+        key = (file_path, file_stat.st_size, file_stat.st_mtime, self.MD5_checksum)
+        if key != self._clean_md5_key:
+            if not self.check_md5(trust_mtime=True):
+                return False
+            self._clean_md5_key = key
+        return True
+
     def validate_uniqueness_on_upload(self, *args, **kwargs):
         """
         Validates that the name and MD5 of the Dataset are unique.
@@ -557,6 +624,14 @@ class Dataset(metadata.models.AccessControl):
         """Computes the MD5 checksum of the Dataset.
         Return None if the file could not be accessed.
         """
+        file_path = self.get_local_path()
+        if file_path is not None:
+            try:
+                return file_access_utils.compute_md5_from_path(file_path)
+            except (IOError, OSError) as e:
+                self.logger.warning('error accessing file: %s', e)
+                return None
+
         data_handle = self.get_open_file_handle("rb")
         if data_handle is None:
             self.logger.warn('cannot access file handle')
@@ -564,15 +639,72 @@ class Dataset(metadata.models.AccessControl):
         with data_handle:
             return file_access_utils.compute_md5(data_handle.file)
 
-    def check_md5(self):
+    def check_md5(self, trust_mtime=False, max_workers=None):
         """
         Checks the MD5 checksum of the Dataset against its stored value.
 
         The stored value is used when regenerating data
         that once existed, as a coherence check.
 
+        :param trust_mtime: if True, skip reading the file when its
+            modification time hasn't changed since it was last verified, and
+            that was less than MD5_REVERIFY_INTERVAL ago.  Corruption doesn't
+            change the modification time, so only use this when speed matters
+            more than a thorough check, like in clean().
+        :param max_workers: number of threads for checking a large file's
+            chunks, defaults to the number of CPUs
         Return True if the check passed, otherwise False.
         """
+        file_path = self.get_local_path()
+        try:
+            file_mtime = file_path and os.stat(file_path).st_mtime
+        except OSError:
+            file_mtime = None
+        if (trust_mtime and
+                file_mtime and
+                file_mtime == self.md5_verified_mtime and
+                timezone.now() - self.md5_verified_time < self.MD5_REVERIFY_INTERVAL):
+            # Not modified since it was last verified.
+            return True
+
+        if not self._check_file_md5(file_path, max_workers):
+            return False
+        if file_mtime and time.time() - file_mtime > self.MD5_SETTLE_TIME:
+            self.md5_verified_mtime = file_mtime
+            self.md5_verified_time = timezone.now()
+            if self.pk is not None:
+                Dataset.objects.filter(pk=self.pk).update(
+                    md5_verified_mtime=self.md5_verified_mtime,
+                    md5_verified_time=self.md5_verified_time)
+        return True
+
+    def clear_md5_verified(self):
+        """ Forget when the MD5 was last verified, because it was rewritten. """
+        self.md5_verified_time = None
+        self.md5_verified_mtime = None
+
+    def _check_file_md5(self, file_path, max_workers=None):
+        """ Read the file, and check that its MD5 matches the stored value.
+
+        :param file_path: the local path to the file, or None if it isn't on
+            the local file system.
+        :param max_workers: number of threads for checking chunks
+        """
+        # Large files can be checked one chunk per core.
+        if self.chunk_checksums and file_path and os.path.isfile(file_path):
+            chunk_info = json.loads(self.chunk_checksums)
+            try:
+                chunk_checksums = file_access_utils.compute_chunk_checksums(
+                    file_path,
+                    chunk_info["algorithm"],
+                    max_workers=max_workers)
+            except ValueError:
+                # Hash algorithm isn't available in this Python.
+                chunk_checksums = None
+            if chunk_checksums == chunk_info["checksums"]:
+                return True
+            # Otherwise fall through, so the mismatch gets logged.
+
         # Recompute the MD5, see if it equals what is already stored
         new_md5 = self.compute_md5()
         if self.MD5_checksum != new_md5:
@@ -587,6 +719,44 @@ class Dataset(metadata.models.AccessControl):
             return False
         return True
 
+    @classmethod
+    def verify_many(cls, datasets, max_workers=None):
+        """
+        Checks the MD5 checksums of several Datasets at once.
+
+        The files are hashed on a pool of threads, so reads from different
+        files overlap and the hashing uses all the cores.  Datasets are taken
+        from the iterable in batches, so it can be a queryset iterator.  Every
+        file is read, even if it hasn't been modified since it was verified.
+
+        :param datasets: an iterable of Datasets to check
+        :param max_workers: number of threads, defaults to the number of CPUs
+        :return: a generator of (dataset, is_ok) pairs, in the same order as
+            datasets
+        """
+        def check(dataset):
+            try:
+                # Already running on a pool, so check each file's chunks in
+                # this thread.
+                return dataset.check_md5(max_workers=1)
+            finally:
+                # Don't leave this thread's connection open, if it used one.
+                connection.close()
+
+        batch_size = 4 * (max_workers or cpu_count())
+        dataset_iter = iter(datasets)
+        pool = ThreadPool(max_workers)
+        try:
+            while True:
+                batch = list(itertools.islice(dataset_iter, batch_size))
+                if not batch:
+                    break
+                for dataset, is_ok in zip(batch, pool.map(check, batch)):
+                    yield dataset, is_ok
+        finally:
+            pool.close()
+            pool.join()
+
     def has_data(self):
         data_handle = self.get_open_file_handle("rb")
         if data_handle is not None:
@@ -643,18 +813,35 @@ class Dataset(metadata.models.AccessControl):
             must be seeked to the beginning.
             If file_handle empty, then uses file_path.
         """
-        opened_file_ourselves = False
-        if file_handle is None:
+        if file_handle is not None:
+            self.MD5_checksum = file_access_utils.compute_md5(file_handle)
+        else:
             if file_path is None:
                 file_path = self.dataset_file.path
-            file_handle = io.open(file_path, "rb")
-            opened_file_ourselves = True
+            self.MD5_checksum = file_access_utils.compute_md5_from_path(file_path)
+        self.clear_md5_verified()
 
-        try:
-            self.MD5_checksum = file_access_utils.compute_md5(file_handle)
-        finally:
-            if opened_file_ourselves:
-                file_handle.close()
+    def set_MD5_and_chunk_checksums(self, file_path):
+        """Set the MD5 hash and chunk checksums, reading the file once.
+
+        :param str file_path:  Path to file to calculate checksums for.
+        """
+        checksum = file_access_utils.ChunkedChecksum()
+        for block in file_access_utils.read_blocks(file_path):
+            checksum.update(block)
+        self.MD5_checksum = checksum.hexdigest()
+        self.clear_md5_verified()
+        self._set_chunk_checksums_from(checksum)
+
+    def _set_chunk_checksums_from(self, checksum):
+        """Set the chunk checksums from a ChunkedChecksum, if the data was large enough."""
+        if checksum.size < file_access_utils.CHUNK_CHECKSUM_MIN_SIZE:
+            self.chunk_checksums = ""
+        else:
+            self._store_chunk_checksums(checksum.algorithm, checksum.chunk_hexdigests())
+
+    def _store_chunk_checksums(self, algorithm, checksums):
+        self.chunk_checksums = json.dumps(dict(algorithm=algorithm, checksums=checksums))
 
     def set_MD5_and_count_rows(self, file_path, file_handle=None):
         """Set the MD5 hash and number of rows from a file.
@@ -669,7 +856,7 @@ class Dataset(metadata.models.AccessControl):
         assert not self.is_raw()
 
         num_rows = -1  # skip header
-        md5gen = hashlib.md5()
+        checksum = file_access_utils.ChunkedChecksum()
 
         opened_file_ourselves = False
         if file_handle is None:
@@ -678,14 +865,16 @@ class Dataset(metadata.models.AccessControl):
 
         try:
             for line in file_handle:
-                md5gen.update(line.encode())
+                checksum.update(line.encode())
                 num_rows += 1
         finally:
             if opened_file_ourselves:
                 file_handle.close()
 
         self.structure.num_rows = num_rows
-        self.MD5_checksum = md5gen.hexdigest()
+        self.MD5_checksum = checksum.hexdigest()
+        self.clear_md5_verified()
+        self._set_chunk_checksums_from(checksum)
 
     @transaction.atomic
     def register_file(self, file_path, file_handle=None):
@@ -722,6 +911,7 @@ class Dataset(metadata.models.AccessControl):
             )
             fname = os.path.basename(full_name)
             self.dataset_file.save(fname, File(file_handle))
+            self._clean_md5_key = None
         finally:
             if opened_file_ourselves:
                 file_handle.close()
@@ -788,6 +978,7 @@ class Dataset(metadata.models.AccessControl):
             empty_SD = instance or cls()
             empty_SD.user = user
             empty_SD.MD5_checksum = ""
+            empty_SD.clear_md5_verified()
             empty_SD.dataset_file = None
             empty_SD.file_source = file_source
             empty_SD.last_time_checked = None
@@ -882,12 +1073,28 @@ class Dataset(metadata.models.AccessControl):
             new_dataset.last_time_checked = timezone.now()
             new_dataset.is_uploaded = is_uploaded
 
+            # Each of these reads the file once, and sets the chunk checksums
+            # if it can.
             if precomputed_md5 is not None:
                 new_dataset.MD5_checksum = precomputed_md5
-            elif new_dataset.is_raw():
-                new_dataset.set_MD5(file_name, file_handle)
-            else:
+                new_dataset.clear_md5_verified()
+                if (file_path and os.path.getsize(file_path) >=
+                        file_access_utils.CHUNK_CHECKSUM_MIN_SIZE):
+                    # The chunk checksums are trusted in place of the MD5, so
+                    # they must come from the same read as the MD5.
+                    new_dataset.set_MD5_and_chunk_checksums(file_path)
+                    if new_dataset.MD5_checksum != precomputed_md5:
+                        raise ValueError(
+                            "File {} has MD5 {}, but expected {}".format(
+                                file_path,
+                                new_dataset.MD5_checksum,
+                                precomputed_md5))
+            elif not new_dataset.is_raw():
                 new_dataset.set_MD5_and_count_rows(file_name, file_handle)
+            elif file_handle is None:
+                new_dataset.set_MD5_and_chunk_checksums(file_path)
+            else:
+                new_dataset.set_MD5(file_name, file_handle)
             if file_handle is not None:
                 file_handle.seek(0)
 
@@ -1082,8 +1289,7 @@ class Dataset(metadata.models.AccessControl):
         icl.start(save=True)
 
         if newly_computed_MD5 is None:
-            with open(new_file_path, "rb") as f:
-                newly_computed_MD5 = file_access_utils.compute_md5(f)
+            newly_computed_MD5 = file_access_utils.compute_md5_from_path(new_file_path)
 
         if newly_computed_MD5 != self.MD5_checksum:
             self.logger.warn(
@@ -1259,10 +1465,16 @@ class Dataset(metadata.models.AccessControl):
 
         self._redacted = True
         self.MD5_checksum = ""
+        self.clear_md5_verified()
         self.externalfiledirectory = None
         if self.external_path:
             self.external_path = ""
-        self.save(update_fields=["_redacted", "MD5_checksum", "externalfiledirectory", "external_path"])
+        self.save(update_fields=["_redacted",
+                                 "MD5_checksum",
+                                 "md5_verified_time",
+                                 "md5_verified_mtime",
+                                 "externalfiledirectory",
+                                 "external_path"])
 
         if bool(self.dataset_file):
             self.dataset_file.delete(save=True)
@@ -1554,8 +1766,8 @@ class ExecRecord(models.Model):
         If this ER represents a trivial cable, then the single ERI and
         ERO should have the same Dataset.
         """
-        eris = self.execrecordins.all()
-        eros = self.execrecordouts.all()
+        eris = self.execrecordins.select_related("generic_input", "dataset")
+        eros = self.execrecordouts.select_related("generic_output", "dataset")
 
         for eri in eris:
             eri.clean()
@@ -1565,7 +1777,7 @@ class ExecRecord(models.Model):
         # Check that the permissions on the generating Run do not exceed those of the inputs.
         # (That the output permissions are the same as the generating Run will be checked
         # by the output Datasets themselves.)
-        input_SDs = [x.dataset for x in self.execrecordouts.all()]
+        input_SDs = [x.dataset for x in eros]
         self.generating_run.validate_restrict_access(input_SDs)
 
         if not self.general_transf().is_method():
@@ -1597,17 +1809,21 @@ class ExecRecord(models.Model):
                 # trivial, we know that both have well-defined
                 # DatasetStructures.
                 elif not self.general_transf().is_trivial():
-                    cable_wires = self.general_transf().custom_wires.all()
+                    cable_wires = self.general_transf().custom_wires.select_related("source_pin", "dest_pin")
 
                     source_CDT = eris[0].dataset.structure.compounddatatype
                     dest_CDT = eros[0].dataset.structure.compounddatatype
+                    source_dts = {member.column_idx: member.datatype
+                                  for member in source_CDT.members.select_related("datatype")}
+                    dest_dts = {member.column_idx: member.datatype
+                                for member in dest_CDT.members.select_related("datatype")}
 
                     for wire in cable_wires:
                         source_idx = wire.source_pin.column_idx
                         dest_idx = wire.dest_pin.column_idx
 
-                        dest_dt = dest_CDT.members.get(column_idx=dest_idx).datatype
-                        source_dt = source_CDT.members.get(column_idx=source_idx).datatype
+                        dest_dt = dest_dts[dest_idx]
+                        source_dt = source_dts[source_idx]
 
                         if source_dt != dest_dt:
                             raise ValidationError(
@@ -2096,13 +2312,15 @@ class ExecRecordOut(models.Model):
 
         # Check that the SD is compatible with generic_output.
 
-        self.logger.debug("ERO SD '{}' is raw? {}".format(
-            self.dataset,
-            self.dataset.is_raw()))
-        self.logger.debug("ERO generic_output '{}' {} is raw? {}".format(
-            self.generic_output,
-            type(self.generic_output),
-            self.generic_output.is_raw()))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            # These arguments need queries, so skip them unless we're logging.
+            self.logger.debug("ERO SD '%s' is raw? %s",
+                              self.dataset,
+                              self.dataset.is_raw())
+            self.logger.debug("ERO generic_output '%s' %s is raw? %s",
+                              self.generic_output,
+                              type(self.generic_output),
+                              self.generic_output.is_raw())
 
         # If SD is raw, the ERO output TO must also be raw
         # Refresh dataset and generic_output to make sure we get the right information.
@@ -78,13 +78,27 @@ class LibrarianTestCase(TestCase, object):
 
     This extends PipelineTestCase, which itself extended
     other stuff (follow the chain).
+    The objects are created once for the class, and reloaded for each test.
+    Their files are only removed when the class is done.
     """
+    @classmethod
+    def setUpTestData(cls):
+        tools.create_librarian_test_environment(cls)
+        cls.shared_files = tools.list_file_owners()
+
+    @classmethod
+    def tearDownClass(cls):
+        # The shared objects still exist until the class transaction is
+        # rolled back by the parent class.
+        tools.clean_up_all_files()
+        super(LibrarianTestCase, cls).tearDownClass()
+
     def setUp(self):
         """Set up default database state for librarian unit testing."""
-        tools.create_librarian_test_environment(self)
+        tools.load_librarian_test_environment(self)
 
     def tearDown(self):
-        tools.clean_up_all_files()
+        tools.clean_up_all_files(keep=self.shared_files)
 
 
 class DatasetTests(LibrarianTestCase):
@@ -143,6 +157,19 @@ class DatasetTests(LibrarianTestCase):
         super(DatasetTests, self).tearDown()
         os.remove(self.file_path)
 
+    def test_str(self):
+        """ The creator is shown the same way, whether or not the user was loaded. """
+        dataset = Dataset.objects.get(pk=self.dataset.pk)
+        dataset_with_user = Dataset.objects.select_related("user").get(pk=self.dataset.pk)
+        expected_str = "good data (created by user {} on {})".format(self.myUser.pk,
+                                                                     dataset.date_created)
+
+        with self.assertNumQueries(0):
+            dataset_str = str(dataset)
+
+        self.assertEqual(expected_str, dataset_str)
+        self.assertEqual(expected_str, str(dataset_with_user))
+
     def test_filehandle(self):
         """
         Test that you can pass a filehandle to create_dataset() to make a dataset.
@@ -1230,6 +1257,113 @@ class DatasetWithFileTests(TestCase):
                                           'checksum "{}"'.format(self.raw_dataset, new_md5, old_md5)),
                                 self.raw_dataset.clean)
 
+    def test_Dataset_clean_reads_unchanged_file_once(self):
+        dataset = Dataset.objects.get(pk=self.raw_dataset.pk)
+        dataset.md5_verified_mtime = None
+        with patch('file_access_utils.compute_md5_from_path',
+                   wraps=file_access_utils.compute_md5_from_path) as mock_compute:
+            dataset.clean()
+            dataset.clean()
+
+        self.assertEqual(1, mock_compute.call_count)
+
+    def test_Dataset_compute_MD5_rereads_file(self):
+        """ Contents changed without changing the size or modification time. """
+        file_path = self.raw_dataset.dataset_file.path
+        old_mtime = time.time() - 60
+        os.utime(file_path, (old_mtime, old_mtime))
+        old_md5 = self.raw_dataset.compute_md5()
+        with open(file_path, 'rb') as f:
+            contents = f.read()
+        with open(file_path, 'wb') as f:
+            f.write(contents.swapcase())
+        os.utime(file_path, (old_mtime, old_mtime))
+
+        new_md5 = self.raw_dataset.compute_md5()
+
+        self.assertNotEqual(old_md5, new_md5)
+
+    def test_Dataset_check_chunk_checksums(self):
+        file_path = self.raw_dataset.dataset_file.path
+        with patch('file_access_utils.CHUNK_CHECKSUM_MIN_SIZE', 0):
+            self.raw_dataset.set_MD5_and_chunk_checksums(file_path)
+        self.assertNotEqual('', self.raw_dataset.chunk_checksums)
+        self.assertTrue(self.raw_dataset.check_md5())
+
+        # The contents of the file are changed, so neither checksum matches.
+        with open(file_path, 'w'):
+            pass
+        self.assertFalse(self.raw_dataset.check_md5())
+
+    def test_Dataset_create_sets_chunk_checksums_in_one_read(self):
+        file_path = self.raw_dataset.dataset_file.path
+        expected_checksums = file_access_utils.compute_chunk_checksums(file_path)
+        with patch('file_access_utils.CHUNK_CHECKSUM_MIN_SIZE', 0), \
+                patch('file_access_utils.read_blocks',
+                      wraps=file_access_utils.read_blocks) as mock_read:
+            dataset = Dataset.create_dataset(file_path,
+                                             user=self.myUser,
+                                             keep_file=False,
+                                             name="big file")
+
+        self.assertEqual(1, mock_read.call_count)
+        self.assertEqual(self.raw_dataset.MD5_checksum, dataset.MD5_checksum)
+        self.assertEqual(expected_checksums, json.loads(dataset.chunk_checksums)["checksums"])
+
+    def test_Dataset_create_rejects_wrong_precomputed_MD5(self):
+        file_path = self.raw_dataset.dataset_file.path
+        expected_md5 = self.raw_dataset.MD5_checksum
+        with patch('file_access_utils.CHUNK_CHECKSUM_MIN_SIZE', 0):
+            self.assertRaisesRegexp(
+                ValueError,
+                re.escape("File {} has MD5 {}, but expected {}".format(
+                    file_path,
+                    expected_md5,
+                    "0"*32)),
+                lambda: Dataset.create_dataset(file_path,
+                                               user=self.myUser,
+                                               keep_file=False,
+                                               name="big file",
+                                               precomputed_md5="0"*32))
+
+    def test_Dataset_check_MD5_skips_unmodified_file(self):
+        file_path = self.raw_dataset.dataset_file.path
+        old_mtime = time.time() - 60
+        os.utime(file_path, (old_mtime, old_mtime))
+        self.assertTrue(self.raw_dataset.check_md5())
+        self.assertEqual(old_mtime, self.raw_dataset.md5_verified_mtime)
+
+        # Change the contents without changing the modification time.
+        with open(file_path, 'w'):
+            pass
+        os.utime(file_path, (old_mtime, old_mtime))
+        self.assertTrue(self.raw_dataset.check_md5(trust_mtime=True))
+
+        # A full check always reads the file.
+        self.assertFalse(self.raw_dataset.check_md5())
+
+        # Once the verification expires, the file is read again.
+        self.raw_dataset.md5_verified_time -= Dataset.MD5_REVERIFY_INTERVAL
+        self.assertFalse(self.raw_dataset.check_md5(trust_mtime=True))
+
+    def test_Dataset_set_MD5_clears_verification(self):
+        file_path = self.raw_dataset.dataset_file.path
+        old_mtime = time.time() - 60
+        os.utime(file_path, (old_mtime, old_mtime))
+        self.assertTrue(self.raw_dataset.check_md5())
+
+        self.raw_dataset.set_MD5(file_path)
+
+        self.assertIsNone(self.raw_dataset.md5_verified_time)
+        self.assertIsNone(self.raw_dataset.md5_verified_mtime)
+
+    def test_Dataset_verify_many(self):
+        datasets = Dataset.objects.filter(pk=self.raw_dataset.pk)
+
+        results = list(Dataset.verify_many(datasets, max_workers=2))
+
+        self.assertEqual([(self.raw_dataset, True)], results)
+
     def test_Dataset_filename_MD5_clash(self):
         ds1, ds2 = Dataset.objects.all()[:2]
         ds1.name = ds2.name
@@ -39,7 +39,8 @@ class DatatypeViewSet(RemovableModelViewSet, SearchableModelMixin):
     * filters[n][key]=user&filters[n][val]=match - username of creator contains the value (case
         insensitive)
     """
-    queryset = Datatype.objects.all()
+    queryset = Datatype.objects.select_related("user").prefetch_related(
+        "restricts", "users_allowed", "groups_allowed")
     serializer_class = DatatypeSerializer
     permission_classes = (permissions.IsAuthenticated, IsDeveloperOrGrantedReadOnly)
     pagination_class = StandardPagination
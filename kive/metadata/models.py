@@ -22,6 +22,7 @@ import math
 from datetime import datetime
 import json
 import itertools
+from operator import attrgetter
 
 from constants import datatypes, CDTs, maxlengths, groups, users
 
@@ -929,7 +930,7 @@ class Datatype(AccessControl):
         ASSUMPTIONS
         1) This Datatype has a prototype, and it is clean
         """
-        self.logger.debug('Checking constraints for Datatype "{}" on its prototype'.format(self))
+        self.logger.debug('Checking constraints for Datatype "%s" on its prototype', self)
 
         with open(self.prototype.dataset_file.path, "rt") as f:
             reader = csv.reader(f)
@@ -968,20 +969,20 @@ class Datatype(AccessControl):
         necessitates a complete_clean() routine.
         """
         if self.has_restriction():
-            self.logger.debug('Cleaning restrictions on Datatype "{}"'.format(self))
+            self.logger.debug('Cleaning restrictions on Datatype "%s"', self)
             self._clean_restrictions()
 
             self.validate_restrict_access(self.restricts.all())
 
         if self.has_basic_constraints():
-            self.logger.debug('Cleaning basic constraints for Datatype "{}"'.format(self))
+            self.logger.debug('Cleaning basic constraints for Datatype "%s"', self)
             self._clean_basic_constraints()
             if self.has_restriction():
                 self._check_constraint_intervals()
                 self._check_basic_constraints_against_supertypes()
 
         if self.has_prototype():
-            self.logger.debug('Cleaning prototype for Datatype "{}"'.format(self))
+            self.logger.debug('Cleaning prototype for Datatype "%s"', self)
             self._clean_prototype()
             self._verify_prototype()
 
@@ -1375,8 +1376,12 @@ class CompoundDatatype(AccessControl):
         # is used in a queryset that has prefetched results). So we just
         members = self.members.all()
 
+        # (If they weren't prefetched, load each member's Datatype with it.)
+        if "members" not in getattr(self, "_prefetched_objects_cache", {}):
+            members = members.select_related("datatype")
+
         # then sort those results in python
-        members = sorted(members, key=lambda x: x.column_idx)
+        members = sorted(members, key=attrgetter("column_idx"))
         if limit is not None and len(members) > limit:
             excess = len(members) - limit + 1
             members = members[:limit-1]
@@ -1386,12 +1391,9 @@ class CompoundDatatype(AccessControl):
         # but the list of members is also typically very small
         # so we can get away with no performance hit here
 
-        string_rep = "("
-        string_rep += ", ".join(str(m) for m in members)
-        string_rep += ")"
-        if string_rep == "()":
-            string_rep = "[empty CompoundDatatype]"
-        return string_rep
+        if not members:
+            return "[empty CompoundDatatype]"
+        return "({})".format(", ".join(str(m) for m in members))
 
     def __str__(self):
         return self._format()
@@ -1421,13 +1423,12 @@ class CompoundDatatype(AccessControl):
         """
         Check if Datatype members have consecutive indices from 1 to n
         """
-        member_dts = []
-        for i, member in enumerate(self.members.order_by("column_idx"), start=1):
+        members = self.members.select_related("datatype").order_by("column_idx")
+        for i, member in enumerate(members, start=1):
             member.full_clean()
             if member.column_idx != i:
                 raise ValidationError(('Column indices of CompoundDatatype "{}" are not consecutive starting from 1'
                                        .format(self)))
-            member_dts.append(member.datatype)
 
     def is_restriction(self, other_cdt):
         """
@@ -1445,20 +1446,23 @@ class CompoundDatatype(AccessControl):
         if self == other_cdt:
             return True
 
+        members = self.members.select_related("datatype")
+        other_members = other_cdt.members.select_related("datatype")
+
         # Make sure they have the same number of columns.
-        if self.members.count() != other_cdt.members.count():
+        if len(members) != len(other_members):
             return False
 
+        other_members = {(other_member.column_idx, other_member.column_name): other_member
+                         for other_member in other_members}
+
         # Since they have the same number of columns at this point,
         # and we have enforced that the numbering of members is
         # consecutive starting from one, we can go through all of this
         # CDT's members and look for the matching one.
-        for member in self.members.all().order_by("column_idx"):
-            try:
-                counterpart = other_cdt.members.get(column_idx=member.column_idx, column_name=member.column_name)
-                if not member.datatype.is_restriction(counterpart.datatype):
-                    return False
-            except CompoundDatatypeMember.DoesNotExist:
+        for member in sorted(members, key=attrgetter("column_idx")):
+            counterpart = other_members.get((member.column_idx, member.column_name))
+            if counterpart is None or not member.datatype.is_restriction(counterpart.datatype):
                 return False
         return True
 
@@ -1508,8 +1512,8 @@ class CompoundDatatype(AccessControl):
         for cdtm in self.members.all():
             if cdtm.column_name != header[cdtm.column_idx-1]:
                 bad_col_indices.append(cdtm.column_idx)
-                self.logger.debug(('Incorrect header for column {}: expected "{}", got "{}"'
-                                   .format(cdtm.column_idx, cdtm.column_name, header[cdtm.column_idx-1])))
+                self.logger.debug('Incorrect header for column %s: expected "%s", got "%s"',
+                                  cdtm.column_idx, cdtm.column_name, header[cdtm.column_idx-1])
 
         if bad_col_indices:
             summary["bad_col_indices"] = bad_col_indices
@@ -5,7 +5,9 @@ import os
 import re
 
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase, skipIfDBFeature
+from django.test.utils import CaptureQueriesContext
 from django.core.urlresolvers import reverse, resolve
 from django.contrib.auth.models import User, Group
 
@@ -29,14 +31,44 @@ class MetadataTestCase(TestCase):
     Set up a database state for unit testing.
 
     Other test classes that require this state can extend this one.
+    The objects are created once for the class, and reloaded for each test
+    so that changes a test makes to them in memory don't leak into the next.
     """
+    @classmethod
+    def setUpTestData(cls):
+        tools.create_metadata_test_environment(cls)
+
     def setUp(self):
-        tools.create_metadata_test_environment(self)
+        tools.load_metadata_test_environment(self)
 
     def tearDown(self):
         tools.clean_up_all_files()
 
 
+@skipIfDBFeature('is_mocked')
+class MetadataTestEnvironmentTests(TestCase):
+    """
+    Guard the number of queries used to build the shared test environment.
+
+    If the environment deliberately grows, raise the budgets.
+    """
+    CREATE_QUERY_BUDGET = 219
+    LOAD_QUERY_BUDGET = 22
+
+    def test_create_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            tools.create_metadata_test_environment(self)
+
+        self.assertLessEqual(len(queries), self.CREATE_QUERY_BUDGET)
+
+    def test_load_queries(self):
+        tools.create_metadata_test_environment(self)
+        with CaptureQueriesContext(connection) as queries:
+            tools.load_metadata_test_environment(self)
+
+        self.assertLessEqual(len(queries), self.LOAD_QUERY_BUDGET)
+
+
 class DatatypeTests(MetadataTestCase):
 
     def setUp(self):
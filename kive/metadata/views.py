@@ -22,6 +22,10 @@ from portal.views import developer_check, admin_check
 
 LOGGER = logging.getLogger(__name__)
 
+# Splits a list of regexps, as in "<pattern 1>","<pattern 2>",...
+# using regex from http://stackoverflow.com/questions/18144431/regex-to-split-a-csv
+REGEXP_LIST_PATTERN = re.compile('(?:^|,)(?=[^"]|(")?)"?((?(1)[^"]*|[^,"]*))"?(?=,|$)')
+
 
 @login_required
 @user_passes_test(developer_check)
@@ -52,7 +56,6 @@ def datatype_add(request):
         dform = DatatypeForm(request.POST, instance=dt)  # create form bound to POST data
         icform = IntegerConstraintForm(request.POST)
         scform = StringConstraintForm(request.POST)
-        query = request.POST.dict()
 
         Python_type = None
         bail_now = False
@@ -76,53 +79,52 @@ def datatype_add(request):
                 new_datatype = dform.save()  # this has to be saved to database to be passed to BasicConstraint()
                 new_datatype.grant_from_json(dform.cleaned_data["permissions"])
 
-                # Manually create and validate BasicConstraint objects.
+                # Manually create and validate BasicConstraint objects, then
+                # save them together.
+                constraints = []
 
                 # The Shipyard builtins.
-                STR = Datatype.objects.get(pk=dt_pks.STR_PK)
-                INT = Datatype.objects.get(pk=dt_pks.INT_PK)
-                FLOAT = Datatype.objects.get(pk=dt_pks.FLOAT_PK)
-                BOOL = Datatype.objects.get(pk=dt_pks.BOOL_PK)
-
-                if Python_type in [STR, BOOL]:
+                if Python_type.pk in [dt_pks.STR_PK, dt_pks.BOOL_PK]:
                     try:
                         for bc_type in ("minlen", "maxlen"):
                             if scform.cleaned_data[bc_type]:
                                 bc = BasicConstraint(datatype=new_datatype, ruletype=bc_type,
                                                      rule=scform.cleaned_data[bc_type])
                                 bc.full_clean()
-                                bc.save()
+                                constraints.append(bc)
 
                         if scform.cleaned_data["regexp"]:
-                            # Check if there are multiple regexps, as in "<pattern 1>","<pattern 2>",...
-                            # using regex from http://stackoverflow.com/questions/18144431/regex-to-split-a-csv
-                            groups = re.findall('(?:^|,)(?=[^"]|(")?)"?((?(1)[^"]*|[^,"]*))"?(?=,|$)',
-                                                scform.cleaned_data["regexp"])
+                            # Check if there are multiple regexps.
+                            groups = REGEXP_LIST_PATTERN.findall(scform.cleaned_data["regexp"])
                             for _quoted, group in groups:
                                 regexp = BasicConstraint(datatype=new_datatype, ruletype="regexp", rule=group)
                                 regexp.full_clean()
-                                regexp.save()
+                                constraints.append(regexp)
 
                     except ValidationError as e:
                         scform.add_error("regexp", e)
                         # Raise e to break the transaction.
                         raise e
 
-                elif Python_type in [INT, FLOAT]:
+                elif Python_type.pk in [dt_pks.INT_PK, dt_pks.FLOAT_PK]:
                     try:
                         for bc_type in ("minval", "maxval"):
                             if icform.cleaned_data[bc_type]:
-                                bc = BasicConstraint(datatype=new_datatype, ruletype=bc_type, rule=query[bc_type])
+                                # Keep the rule as typed: cleaned_data would turn "5" into "5.0".
+                                bc = BasicConstraint(datatype=new_datatype, ruletype=bc_type,
+                                                     rule=request.POST[bc_type])
                                 bc.full_clean()
-                                bc.save()
+                                constraints.append(bc)
                     except ValidationError as e:
                         icform.add_error(bc_type, e)
                         raise e
 
-                # Re-check Datatype object.
+                BasicConstraint.objects.bulk_create(constraints)
+
+                # Re-check Datatype object against its new constraints.  Its
+                # fields were already validated and saved by dform.
                 try:
-                    new_datatype.full_clean()
-                    new_datatype.save()
+                    new_datatype.clean()
                 except ValidationError as e:
                     dform.add_error(None, e)
                     raise e
@@ -148,7 +150,8 @@ def datatype_detail(request, id):
     # retrieve the Datatype object from database by PK
     four_oh_four = False
     try:
-        dt = Datatype.objects.get(pk=id)
+        dt = Datatype.objects.select_related("user").prefetch_related(
+            "basic_constraints", "restricts", "users_allowed", "groups_allowed").get(pk=id)
         if not dt.can_be_accessed(request.user) and not admin_check(request.user):
             four_oh_four = True
     except Datatype.DoesNotExist:
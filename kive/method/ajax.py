@@ -40,7 +40,8 @@ class CodeResourceViewSet(CleanCreateModelMixin,
     * filters[n][key]=user&filters[n][val]=match - username of creator contains the value (case
         insensitive)
     """
-    queryset = CodeResource.objects.all()
+    queryset = CodeResource.objects.select_related("user").prefetch_related(
+        "revisions", "users_allowed", "groups_allowed")
     serializer_class = CodeResourceSerializer
     permission_classes = (permissions.IsAuthenticated, IsDeveloperOrGrantedReadOnly)
     pagination_class = StandardPagination
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.23 on 2026-10-17 07:03
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('method', '0109_method_container'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='coderesourcerevision',
+            name='MD5_checksum',
+            field=models.CharField(blank=True, db_index=True, help_text='Used to validate file contents of this resource revision', max_length=64),
+        ),
+    ]
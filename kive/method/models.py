@@ -9,14 +9,13 @@ from __future__ import unicode_literals
 
 import os
 import stat
-import hashlib
 from inspect import getsourcefile
 import logging
 from subprocess import check_output, STDOUT
 
 from django.db import models, transaction
 from django.db.models import Max
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, pre_save
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator, MinValueValidator
 from django.utils.encoding import python_2_unicode_compatible
@@ -94,9 +93,10 @@ class CodeResource(metadata.models.AccessControl):
         """
         Date of most recent revision to this CodeResource.
         """
-        if self.revisions.count() == 0:
+        revision_dates = [revision.revision_DateTime for revision in self.revisions.all()]
+        if not revision_dates:
             return None
-        return max([revision.revision_DateTime for revision in self.revisions.all()])
+        return max(revision_dates)
 
     def __str__(self):
         return self.name
@@ -170,6 +170,7 @@ class CodeResourceRevision(metadata.models.AccessControl):
     MD5_checksum = models.CharField(
         max_length=64,
         blank=True,
+        db_index=True,
         help_text="Used to validate file contents of this resource revision"
     )
 
@@ -207,6 +208,8 @@ class CodeResourceRevision(metadata.models.AccessControl):
     def __init__(self, *args, **kwargs):
         super(CodeResourceRevision, self).__init__(*args, **kwargs)
         self.logger = logging.getLogger(self.__class__.__name__)
+        # The file and checksum that clean() last verified.
+        self._clean_md5_key = None
 
     def __str__(self):
         """Represent a resource revision by its revision name"""
@@ -227,17 +230,25 @@ class CodeResourceRevision(metadata.models.AccessControl):
         # when a File() object is created without a name argument.
         assert not isinstance(self.content_file.name, int),\
             "file name is an int '{}'".format(self.content_file)
+        if not self.content_file._committed:
+            # A new file is about to be saved.
+            self._clean_md5_key = None
         super(CodeResourceRevision, self).save(*args, **kwargs)
 
     def compute_md5(self):
         """Computes the MD5 checksum of the CodeResourceRevision."""
-        try:
-            self.content_file.open()
-            md5 = file_access_utils.compute_md5(self.content_file.file)
-        finally:
-            self.content_file.close()
+        if self.content_file:
+            try:
+                file_path = self.content_file.path
+            except NotImplementedError:
+                # Storage isn't on the local file system.
+                pass
+            else:
+                return file_access_utils.compute_md5_from_path(file_path)
 
-        return md5
+        self.content_file.open("rb")
+        with self.content_file:
+            return file_access_utils.compute_md5(self.content_file.file)
 
     def check_md5(self):
         """
@@ -258,13 +269,31 @@ class CodeResourceRevision(metadata.models.AccessControl):
 
         return True
 
+    def set_MD5(self):
+        """Set the MD5 checksum from content_file.
+
+        Leaves it blank if there is no file (i.e. if this is a metapackage).
+        """
+        try:
+            # Get the initial state of content_file, so we can preserve it afterwards.
+            initially_closed = self.content_file.closed
+            # Stream the file, instead of reading it all into memory.
+            self.MD5_checksum = file_access_utils.compute_md5(self.content_file)
+            if initially_closed:
+                self.content_file.close()
+
+        except ValueError:
+            self.MD5_checksum = ""
+
     def clean(self):
         """Check coherence of this CodeResourceRevision.
 
         Tests for any circular dependency; does this CRR depend on
         itself at all?  Also, checks for conflicts in the
-        dependencies.  Finally, if there is a file specified, fill in
-        the MD5 checksum.
+        dependencies.  Finally, if this CodeResourceRevision has already
+        been saved, check that its file still matches the MD5 checksum.
+        The checksum itself is filled in by a pre_save signal handler, so
+        the file is only hashed once, when it is first saved.
 
         NOTE: originally we were going to disallow duplicates (by checking the MD5),
         but this will be too restrictive because:
@@ -272,38 +301,25 @@ class CodeResourceRevision(metadata.models.AccessControl):
         b) multiple CodeResourceRevisions may have the same file but different
            dependencies
         """
-        if self.pk is None or not CodeResourceRevision.objects.filter(pk=self.pk).exists():
-            # Set the MD5 if it has never been set before, or leave it blank if there is no file
-            # (i.e. if this is a metapackage).
+        if self.pk is not None and CodeResourceRevision.objects.filter(pk=self.pk).exists():
+            # The CodeResourceRevision already existed, so we should check the MD5,
+            # unless this object already checked the same, unmodified file.
             try:
-                md5gen = hashlib.md5()
-                # print("Before reading, self.content_file is open? {}".format(not self.content_file.closed))
-                # print("Before reading, self.content_file.file is open? {}".format(not self.content_file.file.closed))
-                # print("self.content_file.file is {}".format(self.content_file.file))
-                # print("How about now, is self.content_file open? {}".format(not self.content_file.closed))
-                # print("")
-
-                # Get the initial state of content_file, so we can preserve it afterwards.
-                initially_closed = self.content_file.closed
-                md5gen.update(self.content_file.read())
-                if initially_closed:
-                    self.content_file.close()
-
-                self.MD5_checksum = md5gen.hexdigest()
-
-            except ValueError:
-                self.MD5_checksum = ""
-        else:
-            # The CodeResourceRevision already existed, so we should check the MD5.
-            curr_md5 = self.compute_md5()
-            if curr_md5 != self.MD5_checksum:
-                raise ValidationError(
-                    "File has been corrupted: original MD5=%(orig_md5)s, current MD5=%(curr_md5)s",
-                    params={
-                        "orig_md5": self.MD5_checksum,
-                        "curr_md5": curr_md5
-                    }
-                )
+                file_stat = os.stat(self.content_file.path)
+                key = (self.content_file.path, file_stat.st_size, file_stat.st_mtime, self.MD5_checksum)
+            except (NotImplementedError, OSError, ValueError):
+                key = None
+            if key is None or key != self._clean_md5_key:
+                curr_md5 = self.compute_md5()
+                if curr_md5 != self.MD5_checksum:
+                    raise ValidationError(
+                        "File has been corrupted: original MD5=%(orig_md5)s, current MD5=%(curr_md5)s",
+                        params={
+                            "orig_md5": self.MD5_checksum,
+                            "curr_md5": curr_md5
+                        }
+                    )
+                self._clean_md5_key = key
 
         # Check that user/group access is coherent.
         self.validate_restrict_access([self.coderesource])
@@ -581,7 +597,7 @@ non-reusable: no -- there may be meaningful differences each time (e.g., timesta
             return None
 
         # If inputs/outputs already exist, do nothing.
-        if self.inputs.count() + self.outputs.count() != 0:
+        if self.inputs.exists() or self.outputs.exists():
             return None
         # Copy all inputs/outputs (Including raws) from parent revision to this revision
         else:
@@ -810,3 +826,4 @@ class MethodFamily(transformation.models.TransformationFamily):
 
 # Register signals.
 post_delete.connect(method.signals.code_resource_revision_post_delete, sender=CodeResourceRevision)
+pre_save.connect(method.signals.code_resource_revision_pre_save, sender=CodeResourceRevision)
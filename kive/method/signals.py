@@ -2,3 +2,12 @@ def code_resource_revision_post_delete(instance, **kwargs):
     """Remove a CodeResourceRevision from the file system after it is deleted."""
     if instance.content_file:
         instance.content_file.delete(save=False)
+
+
+def code_resource_revision_pre_save(instance, raw=False, **kwargs):
+    """Set the MD5 checksum of a new CodeResourceRevision before it is saved.
+
+    Checksums that were already set, including the ones in fixtures, are kept.
+    """
+    if instance._state.adding and not raw and not instance.MD5_checksum:
+        instance.set_MD5()
@@ -146,6 +146,21 @@ class FileAccessTests(TestCase):
         test_crr.content_file.close()
         tools.fd_count("open->File->save->close->access->close!")
 
+    def test_save_sets_MD5(self):
+        with open(os.path.join(samplecode_path, self.fn), "rb") as f:
+            expected_md5 = hashlib.md5(f.read()).hexdigest()
+            f.seek(0)
+            test_crr = CodeResourceRevision(
+                coderesource=self.test_cr,
+                revision_name="v1",
+                revision_desc="First version",
+                content_file=File(f),
+                user=self.user_randy)
+            test_crr.save()
+
+        self.assertEqual(expected_md5, test_crr.MD5_checksum)
+        test_crr.content_file.close()
+
     def test_save_close_clean_close(self):
         with open(os.path.join(samplecode_path, self.fn), "rb") as f:
             # Compute the reference MD5
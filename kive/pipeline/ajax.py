@@ -15,7 +15,7 @@ from kive.ajax import IsDeveloperOrGrantedReadOnly, RemovableModelViewSet,\
 from metadata.models import AccessControl
 from pipeline.models import Pipeline, PipelineFamily
 from pipeline.serializers import PipelineFamilySerializer, PipelineSerializer,\
-    PipelineStepUpdateSerializer
+    PipelineStepUpdateSerializer, PIPELINE_PREFETCH_LOOKUPS
 from portal.views import developer_check
 
 LOGGER = logging.getLogger(__name__)
@@ -61,9 +61,10 @@ class PipelineFamilyViewSet(CleanCreateModelMixin,
         if only_is_published:
             qs = qs.filter(published=True)
 
-        member_pipelines = AccessControl.filter_by_user(request.user,
-                                                        is_admin=is_developer,
-                                                        queryset=qs)
+        member_pipelines = AccessControl.filter_by_user(
+            request.user,
+            is_admin=is_developer,
+            queryset=qs).prefetch_related(*PIPELINE_PREFETCH_LOOKUPS)
 
         member_serializer = PipelineSerializer(member_pipelines, many=True,
                                                context={"request": request})
@@ -110,28 +111,10 @@ class PipelineViewSet(CleanCreateModelMixin,
     pagination_class = StandardPagination
 
     def get_queryset(self):
-        prefetchd = Pipeline.objects.prefetch_related(
-            'steps__transformation__method__family',
-            'steps__transformation__pipeline__family',
-            'steps__transformation__inputs__structure',
-            'steps__transformation__outputs__structure',
-            'steps__transformation__method__family',
-            'steps__cables_in__custom_wires',
-            'steps__cables_in__dest__transformationinput',
-            'steps__cables_in__dest__transformationoutput',
-            'steps__cables_in__source__transformationinput',
-            'steps__cables_in__source__transformationoutput',
-            'steps__outputs_to_delete',
-            'inputs__structure',
-            'inputs__transformation',
-            'outcables__source__structure',
-            'outcables__source__transformationinput',
-            'outcables__source__transformationoutput',
-            'outcables__custom_wires__source_pin',
-            'outcables__custom_wires__dest_pin',
-            'outcables__pipeline',
-            'outcables__output_cdt',
-            'outputs__structure')
+        prefetchd = Pipeline.objects.select_related(
+            'family',
+            'user'
+        ).prefetch_related(*PIPELINE_PREFETCH_LOOKUPS)
         # .select_related(
         #     'steps__transformation__pipeline',
         #     'steps__transformation__method',
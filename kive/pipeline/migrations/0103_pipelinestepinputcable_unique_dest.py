@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.23 on 2026-10-17 08:17
+from __future__ import unicode_literals
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def remove_duplicate_cables(apps, schema_editor):
+    """ Keep one cable for each step input, unless runs used more than one. """
+    PipelineStepInputCable = apps.get_model('pipeline', 'PipelineStepInputCable')
+    duplicates = PipelineStepInputCable.objects.values(
+        'pipelinestep', 'dest').annotate(
+        cable_count=Count('id')).filter(cable_count__gt=1).order_by()
+    conflicts = []
+    for duplicate in duplicates:
+        cables = PipelineStepInputCable.objects.filter(
+            pipelinestep_id=duplicate['pipelinestep'],
+            dest_id=duplicate['dest']).annotate(
+            run_count=Count('psic_instances')).order_by('-run_count', 'id')
+        cables = list(cables)
+        if cables[1].run_count:
+            step = cables[0].pipelinestep
+            conflicts.append('pipeline {}, step {}, cables {}'.format(
+                step.pipeline_id,
+                step.id,
+                ', '.join(str(cable.id) for cable in cables)))
+            continue
+        for cable in cables[1:]:
+            cable.delete()
+    if conflicts:
+        raise RuntimeError(
+            'Runs used more than one cable into the same step input: ' +
+            '; '.join(conflicts))
+
+
+def keep_duplicate_cables(apps, schema_editor):
+    pass  # Deleted cables can't be restored.
+
+
+class Migration(migrations.Migration):
+    # PostgreSQL can't alter a table with pending deferred constraint checks
+    # from the deleted rows, so the cleanup commits before the alteration.
+    atomic = False
+
+    dependencies = [
+        ('transformation', '0103_no_default_user'),
+        ('pipeline', '0102_relink_apps'),
+        ('archive', '0107_runinput_ordering_priority_help_text_20170403_1547'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_cables, keep_duplicate_cables),
+        migrations.AlterUniqueTogether(
+            name='pipelinestepinputcable',
+            unique_together=set([('pipelinestep', 'dest')]),
+        ),
+    ]
@@ -211,14 +211,26 @@ class Pipeline(transformation.models.Transformation):
         # Check that steps are clean; this also checks the cabling between steps.
         # Note: we don't call *complete_clean* because this may refer to a
         # "transient" state of the Pipeline whereby it is not complete yet.
-        for i, step in enumerate(self.steps.order_by("step_num"), start=1):
-            step.clean()
+        steps = self.steps.select_related(
+            "transformation__method",
+            "transformation__pipeline"
+        ).prefetch_related(
+            "transformation__inputs",
+            "outputs_to_delete__structure",
+            "cables_in__dest__structure",
+            "cables_in__source__structure"
+        ).order_by("step_num")
+        pipeline_check_memo = {}
+        for i, step in enumerate(steps, start=1):
+            step.clean(pipeline_check_memo)
             if step.step_num != i:
                 raise ValidationError("Steps are not consecutively numbered starting from 1")
 
         # Validate each PipelineOutput(Raw)Cable
-        for i, outcable in enumerate(self.outcables.order_by("output_idx"), start=1):
-            outcable.clean()
+        steps_by_num = {step.step_num: step for step in steps}
+        outcables = self.outcables.select_related("source__structure").order_by("output_idx")
+        for i, outcable in enumerate(outcables, start=1):
+            outcable.clean(steps_by_num)
             if outcable.output_idx != i:
                 raise ValidationError("Outputs are not consecutively numbered starting from 1")
 
@@ -232,10 +244,14 @@ class Pipeline(transformation.models.Transformation):
         """
         self.clean()
 
-        if self.steps.count() == 0:
+        steps = list(self.steps.select_related(
+            "transformation__method",
+            "transformation__pipeline"
+        ).prefetch_related("transformation__inputs"))
+        if not steps:
             raise ValidationError("Pipeline {} has no steps".format(self))
 
-        for step in self.steps.all():
+        for step in steps:
             step.complete_clean()
 
     def create_outputs(self):
@@ -249,9 +265,13 @@ class Pipeline(transformation.models.Transformation):
         self.outputs.all().delete()
 
         # outcables is derived from (PipelineOutputCable/ForeignKey).
-        # For each outcable, extract the cabling parameters.
-        for outcable in self.outcables.all():
-            outcable.create_output()
+        # For each outcable, extract the cabling parameters.  Outputs inherit
+        # from TransformationXput, so they can't be bulk created, but their
+        # structures can.
+        structures = []
+        for outcable in self.outcables.select_related("source__structure"):
+            outcable.create_output(structures=structures)
+        transformation.models.XputStructure.objects.bulk_create(structures)
 
     # Helper to create raw outcables.  This is just so that our unit tests
     # can be easily amended to work in our new scheme, and wouldn't really
@@ -393,7 +413,9 @@ class Pipeline(transformation.models.Transformation):
         TODO: update this code to handle sub-Pipelines within the Pipeline.
         """
         updates = []
-        for step in self.steps.all():
+        steps = self.steps.select_related("transformation__method",
+                                          "transformation__pipeline")
+        for step in steps:
             transformation = step.transformation.find_update()
             # TODO: handle nested pipelines
             if transformation is not None and transformation.is_method():
@@ -498,14 +520,22 @@ class PipelineStep(models.Model):
     def is_cable(self):
         return False
 
-    def recursive_pipeline_check(self, pipeline):
+    def recursive_pipeline_check(self, pipeline, memo=None):
         """Given a pipeline, check if this step contains it.
 
         PRECONDITION: the transformation at this step has been appropriately
         cleaned and does not contain any circularities.  If it does this
         function can be fragile!
+
+        @param memo: a dict of earlier results, so a sub-pipeline used by
+            several steps is only searched once.  Pipeline.clean() shares one
+            between all of its steps.
         """
-        contains_pipeline = False
+        if memo is None:
+            memo = {}
+        key = (self.transformation_id, pipeline.pk)
+        if key in memo:
+            return memo[key]
 
         # Base case 1: the transformation is a method and can't possibly contain the pipeline.
         if self.transformation.is_method():
@@ -518,14 +548,15 @@ class PipelineStep(models.Model):
         # Recursive case: go through all of the target pipeline steps and check if
         # any substeps exactly equal the transformation: if it does, we have circular pipeline references
         else:
-            transf_steps = self.transformation.definite.steps.all()
-            for step in transf_steps:
-                step_contains_pipeline = step.recursive_pipeline_check(pipeline)
-                if step_contains_pipeline:
-                    contains_pipeline = True
+            transf_steps = self.transformation.definite.steps.select_related(
+                "transformation__method",
+                "transformation__pipeline")
+            contains_pipeline = any(step.recursive_pipeline_check(pipeline, memo)
+                                    for step in transf_steps)
+        memo[key] = contains_pipeline
         return contains_pipeline
 
-    def clean(self):
+    def clean(self, pipeline_check_memo=None):
         """
         Check coherence of this step of the pipeline.
 
@@ -538,6 +569,8 @@ class PipelineStep(models.Model):
         it, but it should be clean before being saved. Therefore, this
         checks coherency rather than completeness, for which we call
         complete_clean() - such as cabling.
+
+        @param pipeline_check_memo: shared with recursive_pipeline_check()
         """
         # Check the permissions on the parent Pipeline.
         self.pipeline.validate_restrict_access([self.transformation])
@@ -546,35 +579,49 @@ class PipelineStep(models.Model):
         # the specified pipeline at all.
         self.pipeline.validate_restrict_access([self.transformation])
 
-        if self.recursive_pipeline_check(self.pipeline):
+        if self.recursive_pipeline_check(self.pipeline, pipeline_check_memo):
             raise ValidationError("Step {} contains the parent pipeline".
                                   format(self.step_num))
 
         # Check for multiple cabling to any of the step's inputs.
-        for transformation_input in self.transformation.inputs.all():
-            num_matches = self.cables_in.filter(dest=transformation_input).count()
-            if num_matches > 1:
-                raise ValidationError(
-                    "Input \"{}\" to transformation at step {} is cabled more than once".
-                    format(transformation_input.dataset_name, self.step_num))
+        # The cables' destinations are loaded once here, and reused when
+        # the cables are validated below.
+        cables_in = self.cables_in.all()
+        if "cables_in" not in getattr(self, "_prefetched_objects_cache", {}):
+            cables_in = cables_in.select_related("dest__structure", "source__structure")
+        cables_in = list(cables_in)
+        cabled_inputs = [curr_cable.dest for curr_cable in cables_in]
+        errors = [
+            "Input \"{}\" to transformation at step {} is cabled more than once".
+            format(transformation_input.dataset_name, self.step_num)
+            for transformation_input in self.transformation.inputs.all()
+            if cabled_inputs.count(transformation_input) > 1]
+        if errors:
+            raise ValidationError(errors)
 
         # Validate each cable (Even though we call PS.clean(), we want complete wires)
-        for curr_cable in self.cables_in.all():
+        for curr_cable in cables_in:
             curr_cable.clean_and_completely_wired()
 
-        # Validate each PipelineStep output deletion
-        for curr_del in self.outputs_to_delete.all():
+        # Validate each PipelineStep output deletion.  As with the cables,
+        # the deletions are loaded once and reused for the check below.
+        outputs_to_delete = self.outputs_to_delete.all()
+        if "outputs_to_delete" not in getattr(self, "_prefetched_objects_cache", {}):
+            outputs_to_delete = outputs_to_delete.select_related("structure")
+        outputs_to_delete = list(outputs_to_delete)
+        for curr_del in outputs_to_delete:
             curr_del.clean()
 
         # Note that outputs_to_delete takes care of multiple deletions
         # (if a TO is marked for deletion several times, it will only
         # appear once anyway).  All that remains to check is that the
         # TOs all belong to the transformation at this step.
-        for otd in self.outputs_to_delete.all():
-            if not self.transformation.outputs.filter(pk=otd.pk).exists():
-                raise ValidationError(
-                    "Transformation at step {} does not have output \"{}\"".
-                    format(self.step_num, otd.definite))
+        errors = ["Transformation at step {} does not have output \"{}\"".
+                  format(self.step_num, otd.definite)
+                  for otd in outputs_to_delete
+                  if otd.transformation_id != self.transformation_id]
+        if errors:
+            raise ValidationError(errors)
 
     def complete_clean(self):
         """Executed after the step's wiring has been fully defined, and
@@ -582,15 +629,16 @@ class PipelineStep(models.Model):
         """
         self.clean()
 
-        for transformation_input in self.transformation.inputs.all():
-            # See if the input is specified more than 0 times (and
-            # since clean() was called above, we know that therefore
-            # it was specified exactly 1 time).
-            num_matches = self.cables_in.filter(dest=transformation_input).count()
-            if num_matches == 0:
-                raise ValidationError(
-                    "Input \"{}\" to transformation at step {} is not cabled".
-                    format(transformation_input.dataset_name, self.step_num))
+        # See if each input is specified more than 0 times (and
+        # since clean() was called above, we know that therefore
+        # it was specified exactly 1 time).
+        cabled_inputs = [curr_cable.dest for curr_cable in self.cables_in.select_related("dest")]
+        errors = ["Input \"{}\" to transformation at step {} is not cabled".
+                  format(transformation_input.dataset_name, self.step_num)
+                  for transformation_input in self.transformation.inputs.all()
+                  if transformation_input not in cabled_inputs]
+        if errors:
+            raise ValidationError(errors)
 
     # Helper to create *raw* cables.  This is really just so that all our
     # unit tests can be easily amended; going forwards, there's no real reason
@@ -622,16 +670,12 @@ class PipelineStep(models.Model):
 
     def outputs_to_retain(self):
         """Returns a list of TOs this PipelineStep doesn't delete."""
-        outputs_needed = []
-
-        # Checking each TO of this PS and maintain TOs marked to be deleted
-        for step_output in self.transformation.outputs.all():
-
-            # Check if for this pipeline step we want to delete TO step_output
-            if not self.outputs_to_delete.filter(pk=step_output.pk).exists():
-                outputs_needed.append(step_output)
-
-        return outputs_needed
+        # Load the deleted TOs once (or use them if they were prefetched),
+        # instead of querying for each TO of this PS.
+        deleted_pks = {otd.pk for otd in self.outputs_to_delete.all()}
+        return [step_output
+                for step_output in self.transformation.outputs.all()
+                if step_output.pk not in deleted_pks]
 
     def threads_needed(self):
         if self.transformation.is_pipeline():
@@ -792,7 +836,7 @@ class PipelineCable(models.Model):
 
         # Use wires to determine the CDT of the output of this cable
         for wire in wires:
-            self.logger.debug("Adding CDTM: {} {}".format(wire.dest_pin.column_name, wire.dest_pin.column_idx))
+            self.logger.debug("Adding CDTM: %s %s", wire.dest_pin.column_name, wire.dest_pin.column_idx)
             output_CDT.members.create(datatype=wire.source_pin.datatype,
                                       column_name=wire.dest_pin.column_name,
                                       column_idx=wire.dest_pin.column_idx)
@@ -1032,6 +1076,10 @@ class PipelineStepInputCable(PipelineCable):
 
     # Coherence of data is already enforced by Pipeline
 
+    # Each input of the step can only be fed by one cable.
+    class Meta:
+        unique_together = (("pipelinestep", "dest"),)
+
     def __init__(self, *args, **kwargs):
         super(PipelineStepInputCable, self).__init__(*args, **kwargs)
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -1435,7 +1483,7 @@ class PipelineOutputCable(PipelineCable):
         """Outputs from this cable (only one)."""
         return [self.dest]
 
-    def clean(self):
+    def clean(self, steps_by_num=None):
         """
         Checks coherence of this output cable.
 
@@ -1443,14 +1491,20 @@ class PipelineOutputCable(PipelineCable):
         transformation output hole.  Also, if the cable is raw, there
         should be no custom wiring.  If the cable is not raw and there
         are custom wires, they should be clean.
+
+        @param steps_by_num: the pipeline's steps, keyed by step number, if
+            they are already loaded
         """
         # Step number must be valid for this pipeline
-        if self.source_step > self.pipeline.steps.all().count():
+        if steps_by_num is not None:
+            source_ps = steps_by_num.get(self.source_step)
+        else:
+            source_ps = self.pipeline.steps.filter(
+                step_num=self.source_step).select_related("transformation").first()
+        if source_ps is None:
             raise ValidationError(
                 "Output requested from a non-existent step")
 
-        source_ps = self.pipeline.steps.get(step_num=self.source_step)
-
         # Try to find a matching output hole
         if self.source.transformation.definite != source_ps.transformation.definite:
             raise ValidationError(
@@ -1544,9 +1598,13 @@ class PipelineOutputCable(PipelineCable):
         # Call _wires_match.
         return self._wires_match(other_outcable)
 
-    def create_output(self, x=0, y=0):
+    def create_output(self, x=0, y=0, structures=None):
         """
         Creates the corresponding output for the parent Pipeline.
+
+        If structures is a list, the new output's XputStructure is added to
+        it instead of being saved, so several can be saved with bulk_create().
+        Returns the new output.
         """
         output_requested = self.source
 
@@ -1563,4 +1621,8 @@ class PipelineOutputCable(PipelineCable):
                 min_row=output_requested.get_min_row(),
                 max_row=output_requested.get_max_row()
             )
-            new_structure.save()
+            if structures is None:
+                new_structure.save()
+            else:
+                structures.append(new_structure)
+        return new_pipeline_output
@@ -106,8 +106,12 @@ class PipelineStepSerializer(serializers.ModelSerializer):
     def validate(self, data):
         """
         Check that the cables point to actual inputs of this PipelineStep.
+
+        Each input can only be cabled once.  The database also enforces
+        that, but only when the cables are created.
         """
         curr_transf = data["transformation"].definite
+        cabled_names = set()
         for cable_data in data["cables_in"]:
             # FIXME this is a workaround for weird deserialization behaviour.
             curr_dest_name = cable_data["dest"]["definite"]["dataset_name"]
@@ -116,6 +120,13 @@ class PipelineStepSerializer(serializers.ModelSerializer):
                     'Step {} has no input named "{}"'.format(data["step_num"],
                                                              curr_dest_name)
                 )
+            if curr_dest_name in cabled_names:
+                raise serializers.ValidationError(
+                    'Input "{}" to transformation at step {} is cabled more than once'.format(
+                        curr_dest_name,
+                        data["step_num"])
+                )
+            cabled_names.add(curr_dest_name)
 
         for otd_name in data.get("new_outputs_to_delete_names", []):
             if not curr_transf.outputs.filter(dataset_name=otd_name).exists():
@@ -204,22 +215,6 @@ def _non_pipeline_input_cable_validate_helper(step_num, dataset_name, step_data_
         )
 
 
-def _source_transf_finder(step_num, dataset_name, step_data_dicts):
-    """
-    Get the specified output of a PipelineStep.
-
-    PRE: each step in steps is valid.
-    """
-    # This has been validated so we can be sure that the source step
-    # is well-specified.
-    for specified_step_data in step_data_dicts:
-        if specified_step_data["step_num"] == step_num:
-            break
-
-    curr_transf = specified_step_data["transformation"].definite
-    return curr_transf.outputs.get(dataset_name=dataset_name)
-
-
 class PipelineSummarySerializer(AccessControlSerializer, serializers.ModelSerializer):
     inputs = TransformationInputSerializer(many=True)
 
@@ -228,6 +223,33 @@ class PipelineSummarySerializer(AccessControlSerializer, serializers.ModelSerial
         fields = ("id", "display_name", "url", "published", 'revision_number', 'inputs')
 
 
+# Relations read by PipelineSerializer, so a list of pipelines or a single
+# pipeline can be loaded with one query per relation.
+PIPELINE_PREFETCH_LOOKUPS = (
+    'users_allowed',
+    'groups_allowed',
+    'steps__transformation__method__family',
+    'steps__transformation__pipeline__family',
+    'steps__transformation__inputs__structure',
+    'steps__transformation__outputs__structure',
+    'steps__cables_in__custom_wires',
+    'steps__cables_in__dest__transformationinput',
+    'steps__cables_in__dest__transformationoutput',
+    'steps__cables_in__source__transformationinput',
+    'steps__cables_in__source__transformationoutput',
+    'steps__outputs_to_delete',
+    'inputs__structure',
+    'inputs__transformation',
+    'outcables__source__structure',
+    'outcables__source__transformationinput',
+    'outcables__source__transformationoutput',
+    'outcables__custom_wires__source_pin',
+    'outcables__custom_wires__dest_pin',
+    'outcables__pipeline',
+    'outcables__output_cdt',
+    'outputs__structure')
+
+
 class PipelineSerializer(AccessControlSerializer,
                          serializers.ModelSerializer):
 
@@ -366,12 +388,17 @@ class PipelineSerializer(AccessControlSerializer,
         pipeline.users_allowed.add(*users_allowed)
         pipeline.groups_allowed.add(*groups_allowed)
 
-        # Create the inputs.
+        # Create the inputs.  The cables have been validated, so we look up
+        # their sources and destinations by name in these dictionaries,
+        # instead of querying for each one.
+        pipeline_inputs = {}
+        step_outputs = {}  # {step_num: {dataset_name: output}}
         for input_data in inputs:
             structure_data = None
             if "structure" in input_data:
                 structure_data = input_data.pop("structure")
             curr_input = pipeline.inputs.create(**input_data)
+            pipeline_inputs[curr_input.dataset_name] = curr_input
 
             if structure_data is not None:
                 XputStructure(
@@ -460,8 +487,13 @@ class PipelineSerializer(AccessControlSerializer,
             step_data['transformation'] = new_method
 
             curr_step = pipeline.steps.create(**step_data)
+            step_inputs = {curr_input.dataset_name: curr_input
+                           for curr_input in new_method.inputs.all()}
+            curr_outputs = step_outputs[curr_step.step_num] = {
+                curr_output.dataset_name: curr_output
+                for curr_output in new_method.outputs.all()}
             curr_step.outputs_to_delete.add(
-                *[step_data["transformation"].outputs.get(dataset_name=x) for x in new_outputs_to_delete_names])
+                *[curr_outputs[x] for x in new_outputs_to_delete_names])
 
             for cable_data in cables:
                 custom_wires = cable_data.pop("custom_wires") if "custom_wires" in cable_data else []
@@ -471,15 +503,13 @@ class PipelineSerializer(AccessControlSerializer,
                 source_dataset_name = source_dict["definite"]["dataset_name"]
                 dest_dict = cable_data.pop("dest")
                 dest_dataset_name = dest_dict["definite"]["dataset_name"]
-                dest = step_data["transformation"].inputs.get(
-                    dataset_name=dest_dataset_name)
+                dest = step_inputs[dest_dataset_name]
 
                 source_step_num = cable_data["source_step"]
                 if source_step_num == 0:
-                    source = pipeline.inputs.get(dataset_name=source_dataset_name)
+                    source = pipeline_inputs[source_dataset_name]
                 else:
-                    source = _source_transf_finder(source_step_num,
-                                                   source_dataset_name, steps)
+                    source = step_outputs[source_step_num][source_dataset_name]
 
                 curr_cable = curr_step.cables_in.create(source=source, dest=dest, **cable_data)
 
@@ -496,8 +526,7 @@ class PipelineSerializer(AccessControlSerializer,
             source_dict = outcable_data.pop("source")
             source_dataset_name = source_dict["dataset_name"]
 
-            source = _source_transf_finder(outcable_data["source_step"],
-                                           source_dataset_name, steps)
+            source = step_outputs[outcable_data["source_step"]][source_dataset_name]
             curr_outcable = pipeline.outcables.create(source=source, **outcable_data)
             for wire_data in custom_wires:
                 curr_outcable.custom_wires.create(**wire_data)
@@ -11,6 +11,7 @@ from django.contrib.auth.models import User, Group
 from django.core.exceptions import ValidationError
 from django.core.files.base import File
 from django.core.urlresolvers import resolve
+from django.db import IntegrityError, transaction
 from django.test import TestCase, skipIfDBFeature
 from django.utils import timezone
 from rest_framework import status
@@ -31,8 +32,6 @@ from pipeline.serializers import PipelineSerializer,\
     PipelineStepUpdateSerializer, PipelineFamilySerializer
 import kive.testing_utils as tools
 
-samplecode_path = tools.samplecode_path
-
 
 @skipIfDBFeature('is_mocked')
 class PipelineTestCase(TestCase):
@@ -668,35 +667,30 @@ class PipelineUpdateTests(PipelineTestCase):
         dependencies = MethodDependency.objects.filter(method__in=used_methods)
         dependency = dependencies.earliest('id')  # dependency used in a pipeline
         code_resource_revision = dependency.requirement
-        fn = "GoodRNANucSeq.csv"
-        with open(os.path.join(samplecode_path, fn), "rb") as f:
-            new_revision = CodeResourceRevision(
-                coderesource=code_resource_revision.coderesource,
-                revision_name="rna",
-                revision_desc="Switch to RNA",
-                revision_parent=code_resource_revision,
-                content_file=File(f),
-                user=self.myUser)
-            new_revision.full_clean()
-            new_revision.save()
+        new_revision = CodeResourceRevision(
+            coderesource=code_resource_revision.coderesource,
+            revision_name="rna",
+            revision_desc="Switch to RNA",
+            revision_parent=code_resource_revision,
+            content_file=tools.sample_file("GoodRNANucSeq.csv"),
+            user=self.myUser)
+        new_revision.full_clean()
+        new_revision.save()
         new_revision.grant_everyone_access()
 
         return new_revision
 
     def create_code_revision(self):
         # Define compv2_crRev for comp_cr
-        fn = "complement_v2.py"
-        with open(os.path.join(samplecode_path, fn), "rb") as f:
-            self.compv3_crRev = CodeResourceRevision(
-                coderesource=self.comp_cr,
-                revision_name="v3",
-                revision_desc="Third version: rounder",
-                revision_parent=self.compv2_crRev,
-                content_file=File(f),
-                user=self.myUser)
-        # case.compv2_crRev.content_file.save(fn, File(f))
-            self.compv3_crRev.full_clean()
-            self.compv3_crRev.save()
+        self.compv3_crRev = CodeResourceRevision(
+            coderesource=self.comp_cr,
+            revision_name="v3",
+            revision_desc="Third version: rounder",
+            revision_parent=self.compv2_crRev,
+            content_file=tools.sample_file("complement_v2.py"),
+            user=self.myUser)
+        self.compv3_crRev.full_clean()
+        self.compv3_crRev.save()
         self.compv3_crRev.grant_everyone_access()
 
     def create_method(self):
@@ -1102,20 +1096,11 @@ class SingleRawInputTests(PipelineTestCase):
             dest=method_raw_in,
             source=pipeline_input)
 
-        step1.create_raw_cable(
-            dest=method_raw_in,
-            source=pipeline_input)
-
-        errorMessage = "Input \"a_b_c\" to transformation at step 1 is cabled more than once"
-        self.assertRaisesRegexp(
-            ValidationError,
-            errorMessage,
-            step1.clean)
-
-        self.assertRaisesRegexp(
-            ValidationError,
-            errorMessage,
-            step1.complete_clean)
+        with transaction.atomic():
+            self.assertRaises(IntegrityError,
+                              step1.create_raw_cable,
+                              dest=method_raw_in,
+                              source=pipeline_input)
 
     def test_PipelineStep_completeClean_check_overquenching_different_sources_of_raw_inputs_bad(self):
         # Wire 1 raw input to a pipeline step that expects only 1 input
@@ -1138,16 +1123,11 @@ class SingleRawInputTests(PipelineTestCase):
             dest=method_raw_in,
             source=pipeline_input)
 
-        step1.create_raw_cable(
-            dest=method_raw_in,
-            source=pipeline_input_2)
-
-        errorMessage = "Input \"a_b_c\" to transformation at step 1 is cabled more than once"
-        self.assertRaisesRegexp(ValidationError, errorMessage, step1.clean)
-        self.assertRaisesRegexp(
-            ValidationError,
-            errorMessage,
-            step1.complete_clean)
+        with transaction.atomic():
+            self.assertRaises(IntegrityError,
+                              step1.create_raw_cable,
+                              dest=method_raw_in,
+                              source=pipeline_input_2)
 
     def test_PipelineStep_completeClean_check_underquenching_of_raw_inputs_bad(self):
         # Wire 1 raw input to a pipeline step that expects only 1 input
@@ -1297,20 +1277,11 @@ class SeveralRawInputsTests(PipelineTestCase):
             dest=method_raw_in_2,
             source=pipeline_input_2)
 
-        step1.create_raw_cable(
-            dest=method_raw_in,
-            source=pipeline_input_2)
-
-        errorMessage = "Input \"method_in_1\" to transformation at step 1 is cabled more than once"
-        self.assertRaisesRegexp(
-            ValidationError,
-            errorMessage,
-            step1.clean)
-
-        self.assertRaisesRegexp(
-            ValidationError,
-            errorMessage,
-            step1.complete_clean)
+        with transaction.atomic():
+            self.assertRaises(IntegrityError,
+                              step1.create_raw_cable,
+                              dest=method_raw_in,
+                              source=pipeline_input_2)
 
 
 # August 23, 2013: these also seem pretty redundant, but let's just leave 'em.
@@ -2406,6 +2377,21 @@ class PipelineSerializerTests(TestCase):
             'Step {} has no input named "{}"'.format(1, incorrect_name)
         )
 
+    def test_validate_dest_cabled_twice(self):
+        """
+        A step input with two PSICs should fail.
+        """
+        cables_in = self.pipeline_dict["steps"][0]["cables_in"]
+        cables_in.append(dict(cables_in[0]))
+        ps = PipelineSerializer(data=self.pipeline_dict, context=self.duck_context)
+        self.assertFalse(ps.is_valid())
+        self.assertEquals(
+            ps.errors["steps"][0]["non_field_errors"][0],
+            'Input "{}" to transformation at step {} is cabled more than once'.format(
+                cables_in[0]["dest_dataset_name"],
+                1)
+        )
+
     def test_validate_pipeline_input_source_bad_name(self):
         """
         A PSIC with a Pipeline input source that has a bad name should fail.
@@ -2786,6 +2772,21 @@ class PipelineApiTests(BaseTestCases.ApiTestCase):
         self.assertEquals(new_pipeline.outcables.count(), 1)
         self.assertEquals(new_pipeline.outcables.first().output_name, "untouched_output")
 
+    def test_create_dest_cabled_twice(self):
+        create_pipeline_deserialization_environment(self)
+        cables_in = self.pipeline_dict["steps"][0]["cables_in"]
+        cables_in.append(dict(cables_in[0]))
+        request = self.factory.post(self.list_path, self.pipeline_dict, format="json")
+        force_authenticate(request, user=self.kive_user)
+        response = self.list_view(request)
+
+        self.assertEquals(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEquals(
+            response.data["steps"][0]["non_field_errors"][0],
+            'Input "{}" to transformation at step 1 is cabled more than once'.format(
+                cables_in[0]["dest_dataset_name"])
+        )
+
     def create_new_code_revision(self, coderesource):
         contents = "print('This is the new code.')"
         with tempfile.TemporaryFile() as f:
@@ -690,6 +690,30 @@ class PipelineMockTests(TestCase):
                 "Input \"r\" to transformation at step 1 is not cabled",
                 step1.complete_clean)
 
+    def test_pipeline_with_1_step_and_2_inputs_none_cabled_bad(self):
+        """ Pipeline with 1 step with 2 inputs / 1 output
+
+        Neither input is cabled, and both are reported (bad)
+        """
+        with self.create_valid_pipeline() as p:
+            step1 = p.steps.all()[0]
+            step1.cables_in.clear()
+            step1.inputs[0].dataset_name = "input"
+            m = step1.transformation
+            dest = self.create_input(datatypes.STR_PK,
+                                     dataset_idx=2,
+                                     dataset_name="r")
+            self.add_inputs(m, dest)
+
+            step1.clean()
+            with self.assertRaises(ValidationError) as context:
+                step1.complete_clean()
+
+            self.assertEqual(
+                ['Input "input" to transformation at step 1 is not cabled',
+                 'Input "r" to transformation at step 1 is not cabled'],
+                context.exception.messages)
+
     def test_create_outputs(self):
         """
         Create outputs from output cablings; also change the output cablings
@@ -706,7 +730,8 @@ class PipelineMockTests(TestCase):
                 [call(y=0, x=0, dataset_idx=1, dataset_name='step1_out')],
                 p.outputs.create.call_args_list)
             # noinspection PyUnresolvedReferences
-            self.assertEqual(1, XputStructure.save.call_count)
+            structures, = XputStructure.objects.bulk_create.call_args[0]
+            self.assertEqual(1, len(structures))
 
     def test_create_outputs_multi_step(self):
         """Testing create_outputs with a multi-step pipeline."""
@@ -724,7 +749,8 @@ class PipelineMockTests(TestCase):
                  call(y=0, x=0, dataset_idx=2, dataset_name='step2_out')],
                 p.outputs.create.call_args_list)
             # noinspection PyUnresolvedReferences
-            self.assertEqual(2, XputStructure.save.call_count)
+            structures, = XputStructure.objects.bulk_create.call_args[0]
+            self.assertEqual(2, len(structures))
 
     @contextmanager
     def create_valid_pipeline(self):
@@ -6,6 +6,7 @@ from django.http import HttpResponse, HttpResponseRedirect, Http404
 from django.template import loader
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.exceptions import ValidationError
+from django.db.models import prefetch_related_objects
 
 import json
 import logging
@@ -15,7 +16,7 @@ from metadata.models import CompoundDatatype
 from pipeline.models import Pipeline, PipelineFamily
 import metadata.forms
 from portal.views import developer_check, admin_check
-from pipeline.serializers import PipelineSerializer
+from pipeline.serializers import PipelineSerializer, PIPELINE_PREFETCH_LOOKUPS
 from pipeline.forms import PipelineFamilyDetailsForm, PipelineDetailsForm
 
 LOGGER = logging.getLogger(__name__)
@@ -197,6 +198,7 @@ def pipeline_revise(request, id):
     if four_oh_four:
         raise Http404("ID {} cannot be accessed".format(id))
 
+    prefetch_related_objects([parent_revision], *PIPELINE_PREFETCH_LOOKUPS)
     parent_users_allowed = [x.username for x in parent_revision.users_allowed.all()]
     parent_groups_allowed = [x.name for x in parent_revision.groups_allowed.all()]
     acf = metadata.forms.AccessControlForm(
@@ -295,6 +297,7 @@ def pipeline_view(request, id):
             }
         )
 
+    prefetch_related_objects([pipeline], *PIPELINE_PREFETCH_LOOKUPS)
     t = loader.get_template("pipeline/pipeline_view.html")
     c = {
         "pipeline": pipeline,
@@ -36,16 +36,27 @@ class Command(BaseCommand):
                 self.code_skips += 1
             elif not r.check_md5():
                 self.code_failures += 1
-        for ds in Dataset.objects.iterator():
+        datasets = self.filter_datasets(max_size)
+        for ds, is_ok in Dataset.verify_many(datasets):
+            if not is_ok:
+                self.dataset_failures += 1
+        finish_event.set()
+        report_thread.join()
+
+    def filter_datasets(self, max_size):
+        """ Yield the datasets to check, and count the ones that are left out.
+
+        :param int max_size: maximum size of file to check (bytes), or None
+        """
+        datasets = Dataset.objects.select_related('externalfiledirectory')
+        for ds in datasets.iterator():
             self.dataset_count += 1
             if not ds.has_data():
                 self.dataset_purged += 1
             elif max_size is not None and ds.get_filesize() > max_size:
                 self.dataset_skips += 1
-            elif not ds.check_md5():
-                self.dataset_failures += 1
-        finish_event.set()
-        report_thread.join()
+            else:
+                yield ds
 
     def report(self, interval, finish_event):
         """ Loop until finish_event is set, reporting every few seconds.
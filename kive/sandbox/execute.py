@@ -23,6 +23,7 @@ import pipeline.models
 from method.models import Method, DockerImage
 from datachecking.models import IntegrityCheckLog
 from fleet.exceptions import StopExecution
+from transformation.models import TransformationOutput
 from file_access_utils import copy_and_confirm, FileCreationError
 
 logger = logging.getLogger("Sandbox")
@@ -421,7 +422,7 @@ class Sandbox:
             # This indicates that the only things accessible are the inputs.
             step_nums_completed.append(0)
 
-        step_nums_completed += [x.step_num for x in steps_completed if x.run == run_to_resume]
+        step_nums_completed += [x.step_num for x in steps_completed if x.run_id == run_to_resume.pk]
 
         # A tracker for whether everything is complete or not.
         all_complete = True
@@ -2200,13 +2201,21 @@ class RunPlan(object):
         else:
             self.pipeline = top_level_run.pipeline
 
-        for step in self.pipeline.steps.all():
+        steps = list(self.pipeline.steps.all())
+        output_indices = defaultdict(list)
+        step_outputs = TransformationOutput.objects.filter(
+            transformation_id__in={step.transformation_id for step in steps})
+        for transformation_id, output_idx in step_outputs.values_list("transformation_id",
+                                                                      "dataset_idx"):
+            output_indices[transformation_id].append(output_idx)
+
+        for step in steps:
             step_plan = StepPlan(step.step_num)
             step_plan.pipeline_step = step
             self.step_plans.append(step_plan)
-            for output in step.transformation.outputs.all():
+            for output_idx in output_indices[step.transformation_id]:
                 step_plan.outputs.append(DatasetPlan(step_num=step.step_num,
-                                                     output_num=output.dataset_idx))
+                                                     output_num=output_idx))
             for cable in step.cables_in.order_by("dest__dataset_idx"):
                 if cable.source_step == 0:
                     input_index = cable.source.definite.dataset_idx-1
@@ -7,7 +7,6 @@ import shutil
 from mock import call, patch
 
 from django.contrib.auth.models import User
-from django.core.files import File
 from django.core.files.base import ContentFile
 from django.test import TestCase, skipIfDBFeature
 from django.utils import timezone
@@ -16,7 +15,7 @@ from django.conf import settings
 from archive.models import Run, RunComponent
 from constants import datatypes
 from datachecking.models import IntegrityCheckLog, MD5Conflict
-from kive.testing_utils import clean_up_all_files
+from kive.testing_utils import clean_up_all_files, sample_file
 from kive.tests import install_fixture_files, remove_fixture_files, BaseTestCases
 from librarian.models import Dataset, DatasetStructure, ExternalFileDirectory, ExecRecord
 from metadata.models import Datatype, CompoundDatatype, everyone_group
@@ -46,11 +45,11 @@ def execute_tests_environment_setup(case):
     case.mA_cr.save()
     case.mA_crr = CodeResourceRevision(coderesource=case.mA_cr, revision_name="v1", revision_desc="desc",
                                        user=case.myUser)
-    with open(os.path.join(samplecode_path, "generic_script.py"), "rb") as f:
-        new_file_MD5 = file_access_utils.compute_md5(f)
-        f.seek(0)
-        case.mA_crr.content_file.save("generic_script.py", File(f))
-        case.mA_crr.MD5_checksum = new_file_MD5
+    generic_script = sample_file("generic_script.py")
+    new_file_MD5 = file_access_utils.compute_md5(generic_script)
+    generic_script.seek(0)
+    case.mA_crr.content_file.save("generic_script.py", generic_script)
+    case.mA_crr.MD5_checksum = new_file_MD5
 
     case.mA_crr.save()
 
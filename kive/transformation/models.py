@@ -26,6 +26,15 @@ else:
     zipper = itertools.zip_longest
 
 
+def is_consecutive_from_one(indices):
+    """True if indices are 1 to n in any order, with no duplicates."""
+    indices = list(indices)
+    count = len(indices)
+    return count == 0 or (min(indices) == 1 and
+                          max(indices) == count and
+                          len(set(indices)) == count)
+
+
 @python_2_unicode_compatible
 class TransformationFamily(metadata.models.AccessControl):
     """
@@ -145,29 +154,44 @@ class Transformation(metadata.models.AccessControl):
             return "{}: {}".format(self.definite.revision_number, self.revision_name)
         return str(self.definite.revision_number)
 
-    def check_input_indices(self):
-        """Check that input indices are numbered consecutively from 1."""
-        for i, curr_input in enumerate(self.inputs.order_by("dataset_idx"), start=1):
-            if i != curr_input.dataset_idx:
-                raise ValidationError("Inputs are not consecutively numbered starting from 1")
+    def check_input_indices(self, inputs=None):
+        """Check that input indices are numbered consecutively from 1.
+
+        @param inputs: this Transformation's inputs, if they are already loaded
+        """
+        if inputs is None:
+            indices = self.inputs.values_list("dataset_idx", flat=True)
+        else:
+            indices = [curr_input.dataset_idx for curr_input in inputs]
+        if not is_consecutive_from_one(indices):
+            raise ValidationError("Inputs are not consecutively numbered starting from 1")
 
-    def check_output_indices(self):
-        """Check that output indices are numbered consecutively from 1."""
-        for i, curr_output in enumerate(self.outputs.order_by("dataset_idx"), start=1):
-            if i != curr_output.dataset_idx:
-                raise ValidationError("Outputs are not consecutively numbered starting from 1")
+    def check_output_indices(self, outputs=None):
+        """Check that output indices are numbered consecutively from 1.
+
+        @param outputs: this Transformation's outputs, if they are already loaded
+        """
+        if outputs is None:
+            indices = self.outputs.values_list("dataset_idx", flat=True)
+        else:
+            indices = [curr_output.dataset_idx for curr_output in outputs]
+        if not is_consecutive_from_one(indices):
+            raise ValidationError("Outputs are not consecutively numbered starting from 1")
 
     def clean(self):
         """Validate transformation inputs and outputs, and reject if it is neither Method nor Pipeline."""
         if not self.is_pipeline() and not self.is_method():
             raise ValidationError("Transformation with pk={} is neither Method nor Pipeline".format(self.pk))
 
-        for curr_input in self.inputs.all():
+        # Load each list once, for both the cleaning and the index checks.
+        inputs = list(self.inputs.all())
+        outputs = list(self.outputs.all())
+        for curr_input in inputs:
             curr_input.clean()
-        for curr_output in self.outputs.all():
+        for curr_output in outputs:
             curr_output.clean()
-        self.check_input_indices()
-        self.check_output_indices()
+        self.check_input_indices(inputs)
+        self.check_output_indices(outputs)
 
     def is_identical(self, other):
         """Is this Transformation identical to another?
@@ -468,6 +492,14 @@ class TransformationInput(TransformationXput):
                            ("transformation", "dataset_idx"))
         ordering = ('dataset_idx', )
 
+    # We already know what this is, so don't query the parent links.
+    is_input = True
+    is_output = False
+
+    @property
+    def definite(self):
+        return self
+
 
 class TransformationOutput(TransformationXput):
     """
@@ -493,3 +525,11 @@ class TransformationOutput(TransformationXput):
         unique_together = (("transformation", "dataset_name"),
                            ("transformation", "dataset_idx"))
         ordering = ('dataset_idx', )
+
+    # Similarly to TransformationInput.
+    is_input = False
+    is_output = True
+
+    @property
+    def definite(self):
+        return self
@@ -274,3 +274,14 @@ class TransformationTests(TransformationTestCase):
         self.assertTrue(t1.inputs.count() == t2.inputs.count())
         self.assertTrue(t1.outputs.count() == t2.outputs.count())
         self.assertFalse(t1.is_identical(t2))
+
+
+class ConsecutiveIndexTests(TestCase):
+    def test_consecutive(self):
+        self.assertTrue(is_consecutive_from_one([]))
+        self.assertTrue(is_consecutive_from_one([3, 1, 2]))
+
+    def test_not_consecutive(self):
+        self.assertFalse(is_consecutive_from_one([0, 1, 2]))
+        self.assertFalse(is_consecutive_from_one([1, 3]))
+        self.assertFalse(is_consecutive_from_one([1, 2, 2]))